@@ -3,13 +3,9 @@ from flask_cors import CORS
 import json
 import queue
 import threading
-import sys
-import os
 
-# Add src to path so we can import our modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-from agent_improved import TutoringAgent
+from src.agent_improved import TutoringAgent
+from src.events import EventBatcher
 
 app = Flask(__name__)
 CORS(app)  # Allow Next.js to connect
@@ -19,9 +15,12 @@ event_queue = queue.Queue()
 current_agent = None
 agent_thread = None
 
+# Agent events are coalesced into frames (<= 4/s) before they reach the SSE queue
+event_batcher = EventBatcher(event_queue.put, interval=0.25, max_events=200)
+
 def event_callback(data):
-    """Puts agent events into the queue for SSE"""
-    event_queue.put(data)
+    """Hands agent events to the batcher without blocking the agent thread"""
+    event_batcher.emit(data)
 
 @app.route('/api/start', methods=['POST'])
 def start_agent():
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark (python -X importtime)
+
+Measures what each entry point pays at startup, since shard/worker processes
+are short-lived. Run from the repo root:
+
+    python benchmarks/import_time.py [--repeat 5] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> statement executed in a fresh interpreter
+TARGETS = {
+    "package": "import src",
+    "cli": "import src.cli",
+    "cli --help": "import contextlib, io, src.cli\n"
+                  "with contextlib.redirect_stdout(io.StringIO()):\n"
+                  "    try: src.cli.main(['--help'])\n"
+                  "    except SystemExit: pass",
+    "agent": "import src.agent_improved",
+    "grader": "import src.batch_grader",
+}
+
+HEAVY = ("openai", "requests", "dotenv", "sqlite3")
+
+
+def measure(statement: str):
+    """Return (total_us, {top-level package: cumulative_us}, loaded module names) for one cold import"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=ROOT, capture_output=True, text=True)
+    per_package = {}
+    loaded = set()
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self_us |  cumulative_us | [indent]name"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name[1:]
+        loaded.add(name.strip().split(".")[0])
+        # Top-level (unindented) entries carry the cumulative cost of everything below them
+        if not name.startswith(" "):
+            top = name.split(".")[0]
+            per_package[top] = per_package.get(top, 0) + int(cumulative_us)
+            total += int(cumulative_us)
+    if proc.returncode != 0:
+        per_package["<error>"] = -1
+    return total, per_package, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Cold runs per target (median is reported)")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest top-level imports to list")
+    args = parser.parse_args()
+
+    for name, statement in TARGETS.items():
+        runs = [measure(statement) for _ in range(args.repeat)]
+        runs.sort(key=lambda r: r[0])
+        total, packages, loaded = runs[len(runs) // 2]
+        if "<error>" in packages:
+            print(f"{name:<12} import failed (missing dependency?)")
+            continue
+        heavy = [h for h in HEAVY if h in loaded]
+        print(f"{name:<12} {total / 1000:8.1f} ms   heavy deps loaded: {', '.join(heavy) or 'none'}")
+        for pkg, us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {pkg:<20} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
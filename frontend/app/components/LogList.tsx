@@ -0,0 +1,87 @@
+"use client";
+
+import { useEffect, useLayoutEffect, useRef, useState } from "react";
+import { LogMessage } from "../types";
+
+// Fixed row height lets us window the list: only visible rows are rendered,
+// so cost stays constant no matter how many lines the run has produced.
+const ROW_HEIGHT = 22;
+const OVERSCAN = 12;
+
+const levelClass = (level: LogMessage["level"]) =>
+  level === "error"
+    ? "text-red-400 font-bold"
+    : level === "success"
+    ? "text-emerald-400 font-bold"
+    : level === "system"
+    ? "text-blue-400"
+    : "text-slate-300";
+
+export default function LogList({ logs }: { logs: LogMessage[] }) {
+  const containerRef = useRef<HTMLDivElement>(null);
+  const stickToBottom = useRef(true);
+  const [scrollTop, setScrollTop] = useState(0);
+  const [viewportHeight, setViewportHeight] = useState(0);
+
+  useEffect(() => {
+    const el = containerRef.current;
+    if (!el) return;
+    const observer = new ResizeObserver(() => setViewportHeight(el.clientHeight));
+    observer.observe(el);
+    setViewportHeight(el.clientHeight);
+    return () => observer.disconnect();
+  }, []);
+
+  // Follow new lines only while the user is already at the bottom
+  useLayoutEffect(() => {
+    const el = containerRef.current;
+    if (el && stickToBottom.current) {
+      el.scrollTop = el.scrollHeight;
+      setScrollTop(el.scrollTop);
+    }
+  }, [logs]);
+
+  const onScroll = () => {
+    const el = containerRef.current;
+    if (!el) return;
+    stickToBottom.current = el.scrollHeight - el.scrollTop - el.clientHeight < ROW_HEIGHT * 2;
+    setScrollTop(el.scrollTop);
+  };
+
+  const first = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN);
+  const last = Math.min(logs.length, Math.ceil((scrollTop + viewportHeight) / ROW_HEIGHT) + OVERSCAN);
+
+  return (
+    <div
+      ref={containerRef}
+      onScroll={onScroll}
+      className="flex-1 overflow-y-auto p-4 font-mono text-[11px] custom-scrollbar"
+    >
+      {logs.length === 0 ? (
+        <div className="h-full flex items-center justify-center text-slate-600 text-xs">
+          No logs yet. Start a session to see activity.
+        </div>
+      ) : (
+        <div style={{ height: logs.length * ROW_HEIGHT, position: "relative" }}>
+          {logs.slice(first, last).map((log, i) => (
+            <div
+              key={log.id}
+              title={log.message}
+              style={{ position: "absolute", top: (first + i) * ROW_HEIGHT, height: ROW_HEIGHT, left: 0, right: 0 }}
+              className="flex gap-3 hover:bg-white/5 px-1 rounded transition-colors items-center whitespace-nowrap overflow-hidden"
+            >
+              <span className="text-slate-600 shrink-0 select-none">
+                {new Date(log.timestamp * 1000).toLocaleTimeString([], {
+                  hour12: false,
+                  minute: "2-digit",
+                  second: "2-digit",
+                })}
+              </span>
+              <span className={`${levelClass(log.level)} truncate`}>{log.message}</span>
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  );
+}
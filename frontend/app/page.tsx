@@ -23,7 +23,14 @@ import {
   ChatMessage,
   LevelEstimate,
   StudentInfo,
+  AgentEvent,
+  EventFrame,
+  BreakerState,
 } from "../types";
+import LogList from "./components/LogList";
+
+// Log rows kept in memory; older lines are dropped
+const MAX_LOGS = 5000;
 
 export default function Dashboard() {
   const [status, setStatus] = useState<AgentStatus>("idle");
@@ -37,6 +44,9 @@ export default function Dashboard() {
     topic: "",
   });
 
+  // LLM circuit breaker (degraded-mode badge)
+  const [breakerState, setBreakerState] = useState<BreakerState>("closed");
+
   // Mobile Tab State
   const [activeTab, setActiveTab] = useState<"chat" | "stats">("chat");
   const [finalScores, setFinalScores] = useState<{
@@ -44,17 +54,12 @@ export default function Dashboard() {
     tutoring: string | null;
   }>({ mse: null, tutoring: null });
 
+  const nextLogId = useRef(0);
+
   // Refs for auto-scrolling
-  const logContainerRef = useRef<HTMLDivElement>(null);
   const chatContainerRef = useRef<HTMLDivElement>(null);
   const chatEndRef = useRef<HTMLDivElement>(null);
 
-  useEffect(() => {
-    if (logContainerRef.current) {
-      logContainerRef.current.scrollTop = logContainerRef.current.scrollHeight;
-    }
-  }, [logs]);
-
   useEffect(() => {
     if (chatContainerRef.current) {
       chatContainerRef.current.scrollTo({
@@ -68,36 +73,54 @@ export default function Dashboard() {
     const eventSource = new EventSource("http://localhost:5000/api/stream");
 
     eventSource.onmessage = (e) => {
-      const data = JSON.parse(e.data);
-      if (data.type === "log") {
-        setLogs((prev) => [...prev.slice(-99), data]);
-        // Match format: "🎯 Starting: {topic_name} ({full_student_name})"
-        if (data.message.includes("Starting:")) {
-          const match = data.message.match(/Starting:\s*(.+?)\s*\((.+?)\)/);
-          if (match) {
-            setStudentInfo({ name: match[2], topic: match[1] });
-            setChatHistory([]);
-            setEstimates([]);
-            setCurrentLevel(0);
-            setCurrentConfidence(0);
-            setFinalScores({ mse: null, tutoring: null });
+      const data: EventFrame | AgentEvent = JSON.parse(e.data);
+      const events: AgentEvent[] = data.type === "frame" ? data.events : [data];
+      const newLogs: LogMessage[] = [];
+
+      for (const ev of events) {
+        if (ev.type === "log") {
+          // One row per line keeps list rows fixed-height
+          for (const line of ev.message.split("\n")) {
+            newLogs.push({ ...ev, message: line, id: nextLogId.current++ });
+          }
+          // Match format: "🎯 Starting: {topic_name} ({full_student_name})"
+          if (ev.message.includes("Starting:")) {
+            const match = ev.message.match(/Starting:\s*(.+?)\s*\((.+?)\)/);
+            if (match) {
+              setStudentInfo({ name: match[2], topic: match[1] });
+              setChatHistory([]);
+              setEstimates([]);
+              setCurrentLevel(0);
+              setCurrentConfidence(0);
+              setFinalScores({ mse: null, tutoring: null });
+            }
           }
+          if (ev.message.includes("FINAL_MSE_SCORE:"))
+            setFinalScores((p) => ({
+              ...p,
+              mse: ev.message.split(":")[1].trim(),
+            }));
+          if (ev.message.includes("FINAL_TUTORING_SCORE:"))
+            setFinalScores((p) => ({
+              ...p,
+              tutoring: ev.message.split(":")[1].trim(),
+            }));
+        } else if (ev.type === "state_update") {
+          setChatHistory(ev.history);
+          setEstimates(ev.estimates);
+          setCurrentLevel(ev.current_level);
+          setCurrentConfidence(ev.current_confidence);
+        } else if (ev.type === "breaker") {
+          setBreakerState(ev.state);
         }
-        if (data.message.includes("FINAL_MSE_SCORE:"))
-          setFinalScores((p) => ({
-            ...p,
-            mse: data.message.split(":")[1].trim(),
-          }));
-        if (data.message.includes("FINAL_TUTORING_SCORE:"))
-          setFinalScores((p) => ({
-            ...p,
-            tutoring: data.message.split(":")[1].trim(),
-          }));
-      } else if (data.type === "state_update") {
-        setChatHistory(data.history);
-        setEstimates(data.estimates);
-        setCurrentLevel(data.current_level);
-        setCurrentConfidence(data.current_confidence);
+      }
+
+      // One state update per frame; the buffer is capped so memory stays flat
+      if (newLogs.length) {
+        setLogs((prev) => {
+          const next = prev.concat(newLogs);
+          return next.length > MAX_LOGS ? next.slice(-MAX_LOGS) : next;
+        });
       }
     };
 
@@ -114,6 +137,7 @@ export default function Dashboard() {
       setStatus("running");
       setLogs([]);
       setFinalScores({ mse: null, tutoring: null });
+      setBreakerState("closed");
       setActiveTab("chat");
       try {
         await fetch("http://localhost:5000/api/start", {
@@ -147,6 +171,17 @@ export default function Dashboard() {
           <span className="bg-slate-100 text-slate-500 text-[10px] px-1.5 py-0.5 rounded ml-2 font-bold uppercase tracking-wider">
             Agent
           </span>
+          {breakerState !== "closed" && (
+            <span
+              className={`text-[10px] px-1.5 py-0.5 rounded ml-2 font-bold uppercase tracking-wider ${
+                breakerState === "open"
+                  ? "bg-red-50 text-red-600"
+                  : "bg-amber-50 text-amber-600"
+              }`}
+            >
+              {breakerState === "open" ? "Degraded" : "Recovering"}
+            </span>
+          )}
         </div>
 
         <button
@@ -363,44 +398,7 @@ export default function Dashboard() {
                 <div className="w-2 h-2 rounded-full bg-green-500/20"></div>
               </div>
             </div>
-            <div
-              ref={logContainerRef}
-              className="flex-1 overflow-y-auto p-4 space-y-1.5 font-mono text-[11px] custom-scrollbar"
-            >
-              {logs.length === 0 ? (
-                <div className="h-full flex items-center justify-center text-slate-600 text-xs">
-                  No logs yet. Start a session to see activity.
-                </div>
-              ) : (
-                logs.map((log, i) => (
-                  <div
-                    key={i}
-                    className="flex gap-3 hover:bg-white/5 p-1 rounded transition-colors"
-                  >
-                    <span className="text-slate-600 shrink-0 select-none">
-                      {new Date(log.timestamp * 1000).toLocaleTimeString([], {
-                        hour12: false,
-                        minute: "2-digit",
-                        second: "2-digit",
-                      })}
-                    </span>
-                    <span
-                      className={`${
-                        log.level === "error"
-                          ? "text-red-400 font-bold"
-                          : log.level === "success"
-                          ? "text-emerald-400 font-bold"
-                          : log.level === "system"
-                          ? "text-blue-400"
-                          : "text-slate-300"
-                      }`}
-                    >
-                      {log.message}
-                    </span>
-                  </div>
-                ))
-              )}
-            </div>
+            <LogList logs={logs} />
           </div>
 
           {/* Final Results */}
@@ -3,6 +3,7 @@ export interface LogMessage {
   level: "info" | "error" | "success" | "system";
   message: string;
   timestamp: number;
+  id?: number; // Assigned client-side; stable key for the virtualized list
 }
 
 export interface ChatMessage {
@@ -28,4 +29,22 @@ export interface StateUpdate {
   current_confidence: number;
 }
 
+// LLM circuit breaker transitions (src/circuit_breaker.py)
+export type BreakerState = "closed" | "open" | "half_open";
+
+export interface BreakerUpdate {
+  type: "breaker";
+  state: BreakerState;
+  timestamp: number;
+}
+
+// Anything the agent emits
+export type AgentEvent = LogMessage | StateUpdate | BreakerUpdate;
+
+// Server batches events into frames (see src/events.py)
+export interface EventFrame {
+  type: "frame";
+  events: AgentEvent[];
+}
+
 export type AgentStatus = "idle" | "running" | "stopping";
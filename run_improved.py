@@ -6,14 +6,7 @@ Target: MSE = 0.0, Tutoring = 5.0
 Usage: python run_improved.py --set mini_dev
 """
 
-import sys
-import os
-
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-# Import improved agent
-from agent_improved import main
+from src.cli import main
 
 if __name__ == "__main__":
     print("""
@@ -1,18 +1,38 @@
 """
 Knowunity Agent Olympics 2026 - AI Tutoring System
+
+Public names are resolved lazily (PEP 562) so short-lived processes only pay
+for the modules (and openai/requests/dotenv) they actually use.
 """
 
-from .api_client import KnowunityAPI
-from .level_inference import LevelDetector, HybridLevelDetector
-from .adaptive_tutor import TutorGenerator
-from .agent import TutoringAgent
+import importlib
+
+_LAZY = {
+    "KnowunityAPI": ".api_client",
+    "LLMClientV3": ".llm_client_improved",
+    "LLMFirstDetector": ".level_inference_improved",
+    "RuleValidator": ".level_inference_improved",
+    "TutorGeneratorV3": ".adaptive_tutor_improved",
+    "QualityJudge": ".judge",
+    "PersonalityDetector": ".personality",
+    "TutoringAgent": ".agent_improved",
+    "ModelRouter": ".model_routing",
+    "TranscriptStore": ".transcripts",
+}
 
-__all__ = [
-    "KnowunityAPI",
-    "LevelDetector",
-    "HybridLevelDetector",
-    "TutorGenerator",
-    "TutoringAgent",
-]
+__all__ = sorted(_LAZY)
 
 __version__ = "1.0.0"
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ runs once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,5 @@
+"""python -m src <command> ..."""
+
+from .cli import main
+
+main()
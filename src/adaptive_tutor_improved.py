@@ -1,25 +1,48 @@
 """Tutoring v5.0: The Socratic Engine"""
 
+import time
 from typing import Dict, List, Optional
-from personality import PersonalityDetector
-from judge import QualityJudge
-from prompts_improved import (
+from .personality import PersonalityDetector
+from .judge import QualityJudge
+from .prompts_improved import (
     get_adaptive_tutoring_prompt,
     get_assessment_prompt,
-    get_closing_prompt
+    get_closing_prompt,
+    STYLE_PROFILES,
+    DEGRADED_ASSESSMENT,
+    DEGRADED_CLOSING
 )
+from .circuit_breaker import CircuitOpen
+from .tracing import traced
+from .draft_selector import DraftSelector, SelectionStats
 
 class TutorGeneratorV3:
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, n_drafts: int = 1, selection_stats: Optional[SelectionStats] = None,
+                 content_bank=None, subject_name: str = ""):
         self.llm_client = llm_client
         self.tracker = PersonalityDetector()
         self.judge = QualityJudge(llm_client)
+        self.n_drafts = n_drafts
+        self.selector = DraftSelector()
+        self.selection_stats = selection_stats or SelectionStats()
+        self.content_bank = content_bank
+        self.subject_name = subject_name  # Bank entries are per subject + topic
+        self.bank_questions_used = []
         self.first_student_response = None
         self.concepts_taught = []
     
     def get_opening(self, topic_name: str, subject_name: str) -> str:
+        if self.content_bank:
+            opening = self.content_bank.opening(subject_name, topic_name)
+            if opening:
+                return opening
         return f"Hi! 👋 Today we're working on {topic_name}. To start, what's the first thing that comes to mind when you hear that topic?"
     
+    def get_fallback(self, topic: str, student_name: str) -> str:
+        """Used when the LLM misses the turn deadline: keep the conversation moving"""
+        return f"Let's keep going, {student_name}. Can you walk me through how you'd approach a problem on {topic}, step by step?"
+    
+    @traced("generator.respond")
     def generate_response(
         self,
         conversation_history: List[Dict],
@@ -38,25 +61,45 @@ class TutorGeneratorV3:
             self.first_student_response = last_student_response
             
         # 2. Generate
-        if phase == "assess":
-            return self._generate_assessment(conversation_history, student_level, topic, last_student_response)
-        elif phase == "close":
-            return self._generate_closing(student_level, topic, last_student_response, student_name)
+        try:
+            if phase == "assess":
+                return self._generate_assessment(conversation_history, student_level, topic, last_student_response)
+            elif phase == "close":
+                return self._generate_closing(student_level, topic, last_student_response, student_name)
+            else:
+                return self._generate_tutoring(
+                    conversation_history, student_level, topic, 
+                    last_student_response, student_name
+                )
+        except CircuitOpen:
+            return self.get_degraded_response(phase, student_level, topic, turn_number,
+                                              last_student_response, student_name)
+
+    def get_degraded_response(self, phase: str, level: int, topic: str, turn_number: int,
+                              last_response: str, student_name: str) -> str:
+        """Templated turn for when the LLM circuit is open: no API call"""
+        echo = " ".join(last_response.split()[:6]).rstrip(".,!?")
+        if phase == "close":
+            template = DEGRADED_CLOSING["academic" if level >= 5 else "warm"]
+        elif phase == "assess":
+            template = DEGRADED_ASSESSMENT[turn_number % len(DEGRADED_ASSESSMENT)]
         else:
-            return self._generate_tutoring(
-                conversation_history, student_level, topic, 
-                last_student_response, student_name
-            )
+            templates = STYLE_PROFILES[self._style_key(level)]["templates"]
+            template = templates[turn_number % len(templates)]
+        return template.format(name=student_name, topic=topic, echo=echo or topic)
 
-    def _generate_tutoring(self, history, level, topic, last_response, student_name) -> str:
-        # A. Select Persona
+    def _style_key(self, level: int) -> str:
         # Force "Professor" for Level 5, "Cheerleader" for Level 1-2
         if level >= 5:
-            style_key = "professor"
+            return "professor"
         elif level <= 2:
-            style_key = "cheerleader"
-        else:
-            style_key = "socratic"
+            return "cheerleader"
+        return "socratic"
+
+    @traced("generator.tutoring")
+    def _generate_tutoring(self, history, level, topic, last_response, student_name) -> str:
+        # A. Select Persona
+        style_key = self._style_key(level)
             
         student_state = self.tracker.get_state()
         student_state['last_words'] = last_response[:30] + "..."
@@ -74,19 +117,45 @@ class TutorGeneratorV3:
         Generate response:
         """
         
-        draft = self.llm_client.chat(system_prompt, user_prompt, max_tokens=350)
+        start = time.perf_counter()
+        if self.n_drafts > 1:
+            return self._select_draft(system_prompt, user_prompt, history, level, topic, last_response, student_name, start)
+
+        draft = self.llm_client.chat(system_prompt, user_prompt, site="tutor")
         
         # C. Verify (The Judge enforces the "No Emoji" rule for L5)
-        return self.judge.verify(draft, topic, level, last_response)
+        response = self.judge.verify(draft, topic, level, last_response)
+        self.selection_stats.record_single(time.perf_counter() - start)
+        return response
+
+    def _select_draft(self, system_prompt, user_prompt, history, level, topic, last_response, student_name, start) -> str:
+        """N drafts in one request; the local selector replaces the judge unless no draft passes"""
+        drafts = self.llm_client.chat_n(system_prompt, user_prompt, self.n_drafts, site="tutor")
+        recent = [msg["content"] for msg in history[-6:] if msg["role"] == "tutor"]
+        best, score, issues = self.selector.select(drafts, level, student_name, recent)
+
+        judged = best is None or score < self.selector.ACCEPT_SCORE
+        if best is None:
+            best = self.llm_client.chat(system_prompt, user_prompt, site="tutor")
+        if judged:
+            best = self.judge.verify(best, topic, level, last_response)
+        self.selection_stats.record_multi(time.perf_counter() - start, judged, issues)
+        return best
 
     def _generate_assessment(self, history, level, topic, last_response) -> str:
+        # Pre-generated, level-pitched diagnostic from the warm-up bank: no LLM call
+        if self.content_bank:
+            question = self.content_bank.diagnostic(self.subject_name, topic, level, self.bank_questions_used)
+            if question:
+                self.bank_questions_used.append(question)
+                return question
         system = get_assessment_prompt(level)
-        return self.llm_client.chat(system, f"Topic: {topic}\nStudent said: {last_response}", max_tokens=150)
+        return self.llm_client.chat(system, f"Topic: {topic}\nStudent said: {last_response}", site="assess")
 
     def _generate_closing(self, level, topic, last_response, student_name) -> str:
         first = self.first_student_response or "your first message"
         system = get_closing_prompt(level, first, self.concepts_taught, student_name)
-        return self.llm_client.chat(system, f"Topic: {topic}\nLast words: {last_response}", max_tokens=150)
+        return self.llm_client.chat(system, f"Topic: {topic}\nLast words: {last_response}", site="close")
 
     def _format_history(self, history: List[Dict]) -> str:
         return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in history[-6:]])
\ No newline at end of file
@@ -1,114 +1,364 @@
 """AI Tutoring Agent v5.1: History Aware"""
 
 import time
-from typing import Optional, Callable
-from api_client import KnowunityAPI
-from level_inference_improved import LLMFirstDetector
-from adaptive_tutor_improved import TutorGeneratorV3
-from llm_client_improved import LLMClientV3
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Callable, Iterable, Tuple
+from . import config
+from .api_client import KnowunityAPI
+from .level_inference_improved import LLMFirstDetector
+from .adaptive_tutor_improved import TutorGeneratorV3
+from .llm_client_improved import LLMClientV3
+from .model_routing import ModelRouter
+from .deadlines import DeadlineExceeded
+from .transcripts import TranscriptStore, as_dicts
+from .events import ConsoleSink
+from .draft_selector import SelectionStats
+from .warmup import ContentBank, collect_topics, warm_up
+from .student_profiles import ProfileCache
+from . import tracing
+from .tracing import span
+
+@dataclass
+class PreparedSession:
+    """A session ready for its first send_message"""
+    student_id: str
+    topic_id: str
+    topic_name: str
+    subject_name: str
+    full_student_name: str
+    set_type: str
+    detector: LLMFirstDetector
+    generator: TutorGeneratorV3
+    start_res: Optional[dict]
+    opening: str
+
+
+class SessionPrefetcher:
+    """Prepares up to `depth` upcoming sessions in the background while the current one runs.
+
+    Yields `(pair, future)` in order. With depth 0 sessions are prepared inline.
+    `close()` cancels anything not started yet; conversations already started for
+    cancelled sessions are simply never used.
+    """
+
+    def __init__(self, prepare: Callable, pairs: Iterable, depth: int, should_stop: Callable[[], bool]):
+        self.prepare = prepare
+        self.pairs = iter(pairs)
+        self.depth = depth
+        self.should_stop = should_stop
+        self.pending = deque()
+        self.pool = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="prefetch") if depth > 0 else None
+
+    def __iter__(self):
+        if self.pool is None:
+            for pair in self.pairs:
+                if self.should_stop():
+                    return
+                future = Future()
+                try:
+                    future.set_result(self.prepare(*pair))
+                except Exception as e:
+                    future.set_exception(e)
+                yield pair, future
+            return
+
+        self._fill()
+        while self.pending and not self.should_stop():
+            pair, future = self.pending.popleft()
+            self._fill()  # Keep `depth` sessions preparing while this one runs
+            yield pair, future
+
+    def _fill(self):
+        while len(self.pending) < self.depth and not self.should_stop():
+            pair = next(self.pairs, None)
+            if pair is None:
+                return
+            self.pending.append((pair, self.pool.submit(self.prepare, *pair)))
+
+    def close(self):
+        for _, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
 
 class TutoringAgent:
-    def __init__(self, use_llm: bool = True, event_callback: Optional[Callable] = None):
+    def __init__(self, use_llm: bool = True, event_callback: Optional[Callable] = None,
+                 router: Optional[ModelRouter] = None):
         self.api = KnowunityAPI()
-        self.llm = LLMClientV3() if use_llm else None
+        self.llm = LLMClientV3(router) if use_llm else None
         self.event_callback = event_callback
+        # API/client/router/judge messages go through the same queued console + event frames
+        self.api.log = self.log
+        if self.llm:
+            self.llm.breaker.on_change = self.on_breaker_change
+            self.llm.log = self.llm.router.log = self.log
+        self.console = ConsoleSink()
+        if config.TRACE_FILE:
+            tracing.enable()
         self.stop_requested = False
         self.ASSESS_TURNS = 3
         self.TUTOR_TURNS = 5
+        self.profiles = ProfileCache(enabled=config.STUDENT_PROFILES, strong_prior=config.PROFILE_STRONG_PRIOR,
+                                     assess_turns=self.ASSESS_TURNS)
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.n_drafts = config.MULTI_DRAFT_N
+        self.selection_stats = SelectionStats()
+        self.content_bank = ContentBank(config.CONTENT_BANK_FILE) if config.CONTENT_BANK_FILE else None
+        # (assessment phase wall seconds, seconds spent generating assessment turns) per session;
+        # the content bank replaces assessment generation, so compare runs with the bank on and off
+        self.assess_phase_seconds = []
+        self.transcripts = TranscriptStore(config.TRANSCRIPT_DB) if config.TRANSCRIPT_DB else None
 
     def log(self, message: str, type: str = "info"):
         if self.event_callback:
             self.event_callback({
                 "type": "log", "level": type, "message": message, "timestamp": time.time()
             })
-        print(f"[{type.upper()}] {message}")
+        self.console.write(f"[{type.upper()}] {message}")
+
+    def on_breaker_change(self, previous: str, state: str):
+        """Surface circuit transitions: degraded mode starts/ends here"""
+        if state == "open":
+            self.log("🔌 LLM circuit OPEN: degraded mode (rule-based levels, templated turns)", "error")
+        elif state == "half_open":
+            self.log("🔌 LLM circuit half-open: probing backend", "system")
+        else:
+            self.log("🔌 LLM circuit closed: back to full quality", "success")
+        if self.event_callback:
+            self.event_callback({"type": "breaker", "state": state, "timestamp": time.time()})
+
+    def degraded(self) -> bool:
+        return self.llm is not None and self.llm.breaker.is_degraded()
+
+    def turn_deadline(self):
+        """Shared deadline for every LLM call made while preparing one turn (estimate + reply)"""
+        if self.llm is None:
+            return nullcontext()
+        return self.llm.deadline(config.TURN_DEADLINE_SECONDS)
 
     def emit_state(self, history, estimates, level, conf):
         if self.event_callback:
             self.event_callback({
-                "type": "state_update", "history": history, "estimates": estimates,
+                "type": "state_update", "history": as_dicts(history), "estimates": estimates,
                 "current_level": level, "current_confidence": conf
             })
 
+    def prepare_session(self, student_id: str, topic_id: str, topic_name: str, subject_name: str,
+                        full_student_name: str, set_type: str) -> PreparedSession:
+        """Everything up to the first send_message; safe to run ahead on a prefetch thread"""
+        with span("session.prepare", session=f"{student_id}:{topic_id}"):
+            detector = LLMFirstDetector(self.llm)
+            detector.set_topic(topic_name)
+            generator = TutorGeneratorV3(self.llm, n_drafts=self.n_drafts, selection_stats=self.selection_stats,
+                                         content_bank=self.content_bank, subject_name=subject_name)
+            start_res = None
+            if config.PREFETCH_START_CONVERSATION:
+                try:
+                    start_res = self.api.start_conversation(student_id, topic_id)
+                except Exception as e:
+                    # _run_session starts it inline when start_res is None
+                    self.log(f"⚠️ Prefetched start_conversation failed ({e}); retrying at session start", "error")
+            return PreparedSession(
+                student_id=student_id, topic_id=topic_id, topic_name=topic_name, subject_name=subject_name,
+                full_student_name=full_student_name, set_type=set_type, detector=detector,
+                generator=generator, start_res=start_res, opening=generator.get_opening(topic_name, subject_name))
+
     def run_session(self, student_id: str, topic_id: str, topic_name: str, subject_name: str, full_student_name: str, set_type: str) -> int:
+        prepared = self.prepare_session(student_id, topic_id, topic_name, subject_name, full_student_name, set_type)
+        return self.execute_session(prepared)
+
+    def execute_session(self, prepared: PreparedSession) -> int:
+        with span("session", session=f"{prepared.student_id}:{prepared.topic_id}", topic=prepared.topic_name):
+            return self._run_session(prepared)
+
+    def _run_session(self, prepared: PreparedSession) -> int:
+        student_id, topic_id = prepared.student_id, prepared.topic_id
+        topic_name, full_student_name = prepared.topic_name, prepared.full_student_name
+        session_key = f"{student_id}:{topic_id}"
+        session_start = time.perf_counter()
         self.log(f"🎯 Starting: {topic_name} ({full_student_name})", "system")
         student_first_name = full_student_name.split()[0] if full_student_name else "Student"
 
-        detector = LLMFirstDetector(self.llm)
-        detector.set_topic(topic_name)
-        generator = TutorGeneratorV3(self.llm)
+        detector = prepared.detector
+        generator = prepared.generator
+        assess_turns = self.profiles.seed(student_id, prepared.subject_name, detector, generator.tracker)
+        if assess_turns < self.ASSESS_TURNS:
+            self.log(f"🧠 Known student: level prior {detector.prior['level']:.1f}, "
+                     f"assessing for {assess_turns} turn(s)", "system")
         
-        start_res = self.api.start_conversation(student_id, topic_id)
+        start_res = prepared.start_res or self.api.start_conversation(student_id, topic_id)
         conv_id = start_res["conversation_id"]
+        session_id = None
+        if self.transcripts:
+            session_id = self.transcripts.start_session(
+                self.run_id, prepared.set_type, student_id, full_student_name, topic_id, topic_name,
+                prepared.subject_name)
         max_turns = start_res["max_turns"]
-        tutor_msg = generator.get_opening(topic_name, subject_name)
+        tutor_msg = prepared.opening
         turn = 0
         
         # Simple History Hash to prevent exact duplicate questions
         last_tutor_questions = []
+        assess_generation, assess_recorded = 0.0, False
 
         while turn < max_turns and not self.stop_requested:
-            self.log(f"Turn {turn+1}/{max_turns}", "info")
-            self.log(f"TUTOR: {tutor_msg[:100]}{'...' if len(tutor_msg) > 100 else ''}", "info")
+            with span("turn", session=session_key, turn=turn + 1) as turn_span:
+                self.log(f"Turn {turn+1}/{max_turns}", "info")
+                self.log(f"TUTOR: {tutor_msg[:100]}{'...' if len(tutor_msg) > 100 else ''}", "info")
             
-            # Duplication Check (Basic)
-            if any(q in tutor_msg for q in last_tutor_questions[-2:]):
-                self.log("⚠️ Detected repetition. Rerolling...", "info")
-                # (In a real system, we'd trigger a regenerate here, but for now we proceed)
-            last_tutor_questions.append(tutor_msg)
-
-            res = self.api.send_message(conv_id, tutor_msg)
-            student_msg = res["student_response"]
-            self.log(f"STUDENT: {student_msg[:100]}{'...' if len(student_msg) > 100 else ''}", "info")
+                # Duplication Check (Basic)
+                if any(q in tutor_msg for q in last_tutor_questions[-2:]):
+                    self.log("⚠️ Detected repetition. Rerolling...", "info")
+                    # (In a real system, we'd trigger a regenerate here, but for now we proceed)
+                last_tutor_questions.append(tutor_msg)
+
+                res = self.api.send_message(conv_id, tutor_msg)
+                student_msg = res["student_response"]
+                self.log(f"STUDENT: {student_msg[:100]}{'...' if len(student_msg) > 100 else ''}", "info")
             
-            turn = res["turn_number"]
-            detector.add_exchange(tutor_msg, student_msg)
-            level_est, conf = detector.get_estimate(turn)
-            pred_level = max(1, min(5, round(level_est)))
+                turn = res["turn_number"]
+                detector.add_exchange(tutor_msg, student_msg)
+                # One deadline for the turn's LLM work: level analysis, tutor drafts and the judge
+                with self.turn_deadline():
+                    level_est, conf = detector.get_estimate(turn)
+                    pred_level = max(1, min(5, round(level_est)))
             
-            self.log(f"📈 Level: {level_est:.1f} | Confidence: {conf:.0%}", "info")
+                    self.log(f"📈 Level: {level_est:.1f} | Confidence: {conf:.0%}"
+                             f"{' (rules only)' if self.degraded() else ''}", "info")
+                    if self.transcripts:
+                        self.transcripts.append_exchange(session_id, turn, tutor_msg, student_msg, level_est, conf)
             
-            self.emit_state(detector.conversation_history, detector.estimates_history, level_est, conf)
+                    self.emit_state(detector.conversation_history, detector.estimates_history, level_est, conf)
             
-            if res.get("is_complete"): break
+                    if res.get("is_complete"): break
             
-            phase = "assess" if turn <= self.ASSESS_TURNS else "tutor"
-            if turn > (self.ASSESS_TURNS + self.TUTOR_TURNS): phase = "close"
+                    phase = "assess" if turn <= assess_turns else "tutor"
+                    if turn > (self.ASSESS_TURNS + self.TUTOR_TURNS): phase = "close"
+                    turn_span.set(phase=phase)
+                    if phase != "assess" and not assess_recorded:
+                        self.assess_phase_seconds.append((time.perf_counter() - session_start, assess_generation))
+                        assess_recorded = True
             
-            tutor_msg = generator.generate_response(
-                conversation_history=detector.conversation_history, 
-                student_level=pred_level, 
-                topic=topic_name, 
-                turn_number=turn + 1, 
-                phase=phase, 
-                last_student_response=student_msg, 
-                current_confidence=conf,
-                student_name=student_first_name 
-            )
-            time.sleep(0.5)
+                    generation_start = time.perf_counter()
+                    try:
+                        tutor_msg = generator.generate_response(
+                            conversation_history=detector.conversation_history, 
+                            student_level=pred_level, 
+                            topic=topic_name, 
+                            turn_number=turn + 1, 
+                            phase=phase, 
+                            last_student_response=student_msg, 
+                            current_confidence=conf,
+                            student_name=student_first_name 
+                        )
+                    except DeadlineExceeded as e:
+                        self.log(f"⏱️ {e}. Using fallback message.", "error")
+                        tutor_msg = generator.get_fallback(topic_name, student_first_name)
+                    except Exception as e:
+                        self.log(f"⚠️ Generation failed ({e}). Using fallback message.", "error")
+                        tutor_msg = generator.get_fallback(topic_name, student_first_name)
+                    if phase == "assess":
+                        assess_generation += time.perf_counter() - generation_start
+                with span("sleep"):
+                    time.sleep(0.5)
 
         final_level = detector.get_final_prediction()
         self.log(f"✅ Prediction: Level {final_level}", "success")
+        in_prior = self.profiles.update(student_id, prepared.subject_name, final_level, detector, generator.tracker)
+        if self.profiles.enabled and not in_prior:
+            self.log(f"🧠 {detector.rules_only_turns} rules-only estimates: level kept out of the student's prior",
+                     "system")
+        if self.transcripts:
+            self.transcripts.finish_session(session_id, final_level)
         return final_level
 
     def run_all_sessions(self, set_type: str = "mini_dev"):
         try:
             students = self.api.get_students(set_type)
-            preds = []
-            for s in students:
-                if self.stop_requested: break
-                topics = self.api.get_student_topics(s["id"])
-                for t in topics:
-                    if self.stop_requested: break
-                    level = self.run_session(s["id"], t["id"], t["name"], t["subject_name"], s["name"], set_type)
-                    preds.append({"student_id": s["id"], "topic_id": t["id"], "predicted_level": float(level)})
-            
-            if preds and not self.stop_requested:
-                self.log("📊 Submitting...", "system")
-                mse = self.api.submit_predictions(preds, set_type)
-                self.log(f"MSE: {mse.get('mse_score')}", "success")
-                tutoring = self.api.evaluate_tutoring(set_type)
-                self.log(f"TUTORING: {tutoring.get('score')}/5.0", "success")
-                
+            topics_by_student = collect_topics(self.api, students)
+            pairs = [(s, t) for s in students for t in topics_by_student[s["id"]]]
+            self.run_pairs(pairs, set_type)
         except Exception as e:
-            self.log(f"Error: {e}", "error")
\ No newline at end of file
+            self.log(f"Error: {e}", "error")
+        finally:
+            self.log_run_report()
+            self.close()
+
+    def run_pairs(self, pairs: List[Tuple[dict, dict]], set_type: str, evaluate_tutoring: bool = True) -> Dict:
+        """Run sessions for (student, topic) pairs, submit predictions and return the scores"""
+        if self.transcripts:
+            self.transcripts.start_run(self.run_id, set_type)
+        if self.content_bank is not None and self.llm:
+            warm_up(self.llm, self.content_bank, [t for _, t in pairs], log=lambda m: self.log(m, "system"))
+
+        prefetcher = SessionPrefetcher(
+            lambda s, t: self.prepare_session(s["id"], t["id"], t["name"], t["subject_name"], s["name"], set_type),
+            iter(pairs), config.PREFETCH_DEPTH, lambda: self.stop_requested)
+        preds = []
+        try:
+            for (s, t), prepared in prefetcher:
+                if self.stop_requested: break
+                try:
+                    level = self.execute_session(prepared.result())
+                except DeadlineExceeded as e:
+                    # Don't abandon the set over one slow session
+                    self.log(f"⏱️ Session deadline missed ({e}). Predicting default level.", "error")
+                    level = 3
+                except Exception as e:
+                    # ...or over one failed session: keep throughput, predict the default
+                    self.log(f"⚠️ Session failed ({e}). Predicting default level.", "error")
+                    level = 3
+                preds.append({"student_id": s["id"], "topic_id": t["id"], "predicted_level": float(level)})
+        finally:
+            prefetcher.close()
+
+        result = {"sessions": len(preds), "mse": None, "tutoring": None}
+        if preds and not self.stop_requested:
+            self.log("📊 Submitting...", "system")
+            result["mse"] = self.api.submit_predictions(preds, set_type).get("mse_score")
+            self.log(f"MSE: {result['mse']}", "success")
+            if evaluate_tutoring:
+                result["tutoring"] = self.api.evaluate_tutoring(set_type).get("score")
+                self.log(f"TUTORING: {result['tutoring']}/5.0", "success")
+            if self.transcripts:
+                self.transcripts.finish_run(self.run_id, result["mse"], result["tutoring"])
+        return result
+
+    def log_run_report(self):
+        """End-of-run reports; also flushes transcripts, the trace file and the console"""
+        if self.transcripts:
+            self.transcripts.flush()
+            if self.transcripts.dropped:
+                self.log(f"⚠️ {self.transcripts.dropped} transcript rows could not be saved", "error")
+        if self.llm:
+            self.log("💸 Model routing report:\n" + self.llm.router.format_report(), "system")
+            self.log(f"⏱️ Tail latency: {self.llm.hedge.format_report()}", "system")
+            self.log(f"🗳️ Draft selection: {self.selection_stats.format_report()}", "system")
+            breaker = self.llm.breaker.report()
+            self.log(f"🔌 Circuit breaker: {breaker['state']}, {breaker['trips']} trips, "
+                     f"{breaker['rejected']} calls served degraded", "system")
+        self.log("🧠 Student profiles:\n" + self.profiles.format_report(), "system")
+        if self.assess_phase_seconds:
+            n = len(self.assess_phase_seconds)
+            wall = sum(w for w, _ in self.assess_phase_seconds) / n
+            generation = sum(g for _, g in self.assess_phase_seconds) / n
+            bank = "on" if self.content_bank is not None else "off"
+            self.log(f"🚀 Assessment phase (bank {bank}): avg {wall:.1f}s wall, "
+                     f"{generation * 1000:.0f} ms generating tutor turns, over {n} sessions", "system")
+        if tracing.is_enabled() and config.TRACE_FILE:
+            tracing.export(config.TRACE_FILE)
+            self.log(f"🧵 Trace written to {config.TRACE_FILE}", "system")
+        self.console.flush()
+
+    def close(self):
+        """Stop the agent's background threads (console writer, LLM pool, transcript writer)"""
+        if self.transcripts:
+            self.transcripts.close()
+        if self.llm:
+            self.llm.close()
+        self.console.close()
@@ -3,7 +3,9 @@
 import requests
 import time
 from typing import List, Dict, Optional
-import config
+from . import config
+from .model_routing import print_log
+from .tracing import traced
 
 class KnowunityAPI:
     def __init__(self):
@@ -12,6 +14,7 @@ class KnowunityAPI:
             "Content-Type": "application/json",
             "x-api-key": config.KNOWUNITY_API_KEY
         }
+        self.log = print_log  # The agent points this at its non-blocking console/event log
     
     # ============ CATALOG (No Auth) ============
     
@@ -33,6 +36,7 @@ class KnowunityAPI:
         r.raise_for_status()
         return r.json()["students"]
     
+    @traced("api.get_student_topics")
     def get_student_topics(self, student_id: str) -> List[Dict]:
         r = requests.get(f"{self.base_url}/students/{student_id}/topics")
         r.raise_for_status()
@@ -40,6 +44,7 @@ class KnowunityAPI:
     
     # ============ INTERACTIONS (Auth Required) ============
     
+    @traced("api.start_conversation")
     def start_conversation(self, student_id: str, topic_id: str) -> Dict:
         r = requests.post(
             f"{self.base_url}/interact/start",
@@ -49,6 +54,7 @@ class KnowunityAPI:
         r.raise_for_status()
         return r.json()
     
+    @traced("student.send_message")
     def send_message(self, conversation_id: str, tutor_message: str) -> Dict:
         payload = {
             "conversation_id": conversation_id,
@@ -61,7 +67,7 @@ class KnowunityAPI:
             json=payload
         )
         if r.status_code == 422:
-            print(f"⚠️  422 Unprocessable Entity: {r.text[:500]}")
+            self.log(f"⚠️  422 Unprocessable Entity: {r.text[:500]}", "error")
         r.raise_for_status()
         return r.json()
     
@@ -76,7 +82,7 @@ class KnowunityAPI:
         try:
             return r.json()
         except Exception:
-            print(f"Error submitting predictions: {r.text}")
+            self.log(f"Error submitting predictions: {r.text}", "error")
             raise
     
     def evaluate_tutoring(self, set_type: str = "mini_dev") -> Dict:
@@ -97,16 +103,16 @@ class KnowunityAPI:
                     return r.json()
                 except requests.exceptions.JSONDecodeError:
                     if r.status_code == 504:
-                        print(f"⚠️ Gateway Timeout (504) on attempt {attempt+1}. Retrying...")
+                        self.log(f"⚠️ Gateway Timeout (504) on attempt {attempt+1}. Retrying...", "error")
                     else:
-                        print(f"⚠️ API Error ({r.status_code}): {r.text[:200]}")
+                        self.log(f"⚠️ API Error ({r.status_code}): {r.text[:200]}", "error")
                         if attempt == max_retries - 1:
                             return {"score": 0.0, "error": "Failed to get score"}
                             
             except requests.exceptions.Timeout:
-                print(f"⚠️ Request timed out on attempt {attempt+1}. Retrying...")
+                self.log(f"⚠️ Request timed out on attempt {attempt+1}. Retrying...", "error")
             except Exception as e:
-                print(f"⚠️ Error: {e}")
+                self.log(f"⚠️ Error: {e}", "error")
             
             time.sleep(2)  # Wait before retry
             
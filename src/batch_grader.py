@@ -0,0 +1,212 @@
+"""Batch Grader: Offline QualityJudge Scoring of Stored Transcripts
+
+Usage: python -m src grade transcripts.sqlite --out grades.sqlite
+"""
+
+import argparse
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turn_scores (
+    run_id TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    topic_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    level INTEGER,
+    score REAL,
+    raw TEXT,
+    PRIMARY KEY (run_id, student_id, topic_id, turn)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    set_type TEXT,
+    mse REAL,
+    tutoring_score REAL
+);
+CREATE VIEW IF NOT EXISTS session_scores AS
+    SELECT run_id, student_id, topic_id,
+           AVG(score) AS avg_score, MIN(score) AS min_score, COUNT(*) AS turns
+    FROM turn_scores GROUP BY run_id, student_id, topic_id;
+"""
+
+SCORE_RE = re.compile(r"score:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def parse_score(raw: str) -> Optional[float]:
+    match = SCORE_RE.search(raw or "")
+    return float(match.group(1)) if match else None
+
+
+class RateLimiter:
+    """Token bucket shared by all grading workers"""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+
+class ResultsDB:
+    """SQLite results file; existing rows make a rerun resume where it stopped"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def graded_keys(self, run_id: str) -> set:
+        rows = self.conn.execute(
+            "SELECT student_id, topic_id, turn FROM turn_scores WHERE run_id = ? AND score IS NOT NULL",
+            (run_id,))
+        return set(rows)
+
+    def write_turns(self, rows: Iterable[Tuple]):
+        self.conn.executemany("INSERT OR REPLACE INTO turn_scores VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def write_run(self, record: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)",
+            (record["run_id"], record.get("set_type"), record.get("mse"), record.get("tutoring_score")))
+        self.conn.commit()
+
+    def correlation(self) -> Optional[float]:
+        """Pearson r between a run's mean judge score and its official tutoring score"""
+        pairs = self.conn.execute("""
+            SELECT AVG(t.score), r.tutoring_score FROM turn_scores t JOIN runs r USING (run_id)
+            WHERE t.score IS NOT NULL AND r.tutoring_score IS NOT NULL GROUP BY t.run_id
+        """).fetchall()
+        if len(pairs) < 3:
+            return None
+        xs, ys = zip(*pairs)
+        mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+        cov = sum((x - mx) * (y - my) for x, y in pairs)
+        vx = sum((x - mx) ** 2 for x in xs)
+        vy = sum((y - my) ** 2 for y in ys)
+        return cov / (vx * vy) ** 0.5 if vx and vy else None
+
+
+def iter_turn_jobs(records: Iterable[Dict], db: ResultsDB) -> Iterator[Dict]:
+    """Expand session records into one job per tutor reply, skipping already-graded turns"""
+    done_by_run = {}
+    for record in records:
+        if record.get("type") == "run":
+            db.write_run(record)
+            continue
+        run_id = record["run_id"]
+        if run_id not in done_by_run:
+            done_by_run[run_id] = db.graded_keys(run_id)
+        done = done_by_run[run_id]
+
+        history = record["history"]
+        estimates = record.get("estimates") or []
+        first_name = (record.get("student_name") or "Student").split()[0]
+        # history alternates tutor/student; grade each tutor reply to a student message
+        for i in range(2, len(history), 2):
+            turn = i // 2 + 1
+            if (record["student_id"], record["topic_id"], turn) in done:
+                continue
+            est = estimates[turn - 2]["level"] if len(estimates) >= turn - 1 else record["predicted_level"]
+            yield {
+                "run_id": run_id, "student_id": record["student_id"], "topic_id": record["topic_id"],
+                "turn": turn, "level": max(1, min(5, round(est))), "topic": record["topic_name"],
+                "student_name": first_name, "response": history[i]["content"],
+                "last_student_msg": history[i - 1]["content"],
+            }
+
+
+class BatchGrader:
+    """Fans grade_response calls out over a bounded worker pool"""
+
+    def __init__(self, judge, db: ResultsDB, concurrency: int = 8, rate_per_second: float = 5.0,
+                 flush_every: int = 50):
+        self.judge = judge
+        self.db = db
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate_per_second)
+        self.flush_every = flush_every
+        self.graded = 0
+        self.failed = 0
+
+    def _grade(self, job: Dict) -> Tuple:
+        self.limiter.acquire()
+        raw = self.judge.grade_response(
+            job["response"], job["topic"], job["level"], job["student_name"], job["last_student_msg"])
+        return (job["run_id"], job["student_id"], job["topic_id"], job["turn"],
+                job["level"], parse_score(raw), raw)
+
+    def run(self, jobs: Iterator[Dict]):
+        buffer = []
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for job in jobs:
+                # Keep at most 2x concurrency jobs queued so huge inputs stream through
+                if len(in_flight) >= self.concurrency * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    buffer.extend(self._collect(done))
+                in_flight.add(pool.submit(self._grade, job))
+                if len(buffer) >= self.flush_every:
+                    self._flush(buffer)
+            done, _ = wait(in_flight)
+            buffer.extend(self._collect(done))
+        self._flush(buffer)
+
+    def _collect(self, futures) -> list:
+        rows = []
+        for future in futures:
+            row = future.result()
+            if row[5] is None:
+                self.failed += 1
+            else:
+                self.graded += 1
+            rows.append(row)
+        return rows
+
+    def _flush(self, buffer: list):
+        if buffer:
+            self.db.write_turns(buffer)
+            print(f"  💾 {self.graded} graded, {self.failed} unparsed")
+            buffer.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src grade",
+                                     description="Grade stored transcripts with QualityJudge")
+    parser.add_argument("transcripts", nargs="+", help="SQLite transcript stores (TRANSCRIPT_DB)")
+    parser.add_argument("--out", default="grades.sqlite", help="SQLite results file")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=5.0, help="Max grading calls per second")
+    args = parser.parse_args(argv)
+
+    from .judge import QualityJudge
+    from .llm_client_improved import LLMClientV3
+    from .transcripts import iter_transcripts
+
+    db = ResultsDB(args.out)
+    llm = LLMClientV3()
+    grader = BatchGrader(QualityJudge(llm), db, args.concurrency, args.rps)
+    start = time.time()
+    grader.run(iter_turn_jobs(iter_transcripts(args.transcripts), db))
+    print(f"✅ Graded {grader.graded} turns in {time.time() - start:.0f}s -> {args.out}")
+
+    r = db.correlation()
+    if r is not None:
+        print(f"📈 Correlation with official tutoring score: r = {r:.2f}")
+    print(llm.router.format_report())
+
+
+if __name__ == "__main__":
+    main()
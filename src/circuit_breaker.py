@@ -0,0 +1,87 @@
+"""Circuit Breaker: Failing Fast When the LLM Backend Is Slow or Down"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"        # Normal operation
+OPEN = "open"            # Backend considered down: calls fail fast, degraded mode
+HALF_OPEN = "half_open"  # Cooldown over: let one probe through to test recovery
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the LLM while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Trips on error rate or slow-call rate over a rolling window of calls.
+
+    A call that uses more than `slow_fraction` of its own timeout counts as a
+    failure, so brownouts trip the breaker as well as hard errors. "Slow" is
+    relative to each call site: a 40s warm-up call is fine, a 40s judge call is not.
+    """
+
+    def __init__(self, error_rate: float = 0.5, slow_fraction: float = 0.67, window: int = 20,
+                 min_calls: int = 5, cooldown: float = 30.0,
+                 on_change: Optional[Callable[[str, str], None]] = None):
+        self.error_rate = error_rate
+        self.slow_fraction = slow_fraction
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.on_change = on_change
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)  # True = failure
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend right now"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, seconds: float, timeout: float, error: bool = False):
+        """One finished call; `timeout` is the route timeout it ran under"""
+        failed = error or seconds > self.slow_fraction * timeout
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.outcomes.clear()
+                    self._transition(CLOSED)
+                return
+            self.outcomes.append(failed)
+            if self.state == CLOSED and len(self.outcomes) >= self.min_calls:
+                if sum(self.outcomes) / len(self.outcomes) >= self.error_rate:
+                    self._open()
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        if self.on_change and previous != state:
+            self.on_change(previous, state)
+
+    def is_degraded(self) -> bool:
+        """Open or half-open: calls are (mostly) being rejected"""
+        return self.state != CLOSED
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "trips": self.trips, "rejected": self.rejected}
@@ -0,0 +1,109 @@
+"""Command Line: One Entry Point for Every Agent Task
+
+Usage:
+    python -m src run --set mini_dev
+    python -m src warmup --set dev
+    python -m src grade transcripts.sqlite --out grades.sqlite
+    python -m src trace-summary trace.json
+    python -m src experiment matrix.json --workers 4
+"""
+
+import argparse
+import sys
+
+COMMANDS = ("run", "warmup", "grade", "trace-summary", "experiment")
+
+
+def cmd_run(args):
+    # Heavy imports (openai, requests, dotenv) only happen for commands that need them
+    from .agent_improved import TutoringAgent
+    from .model_routing import ModelRouter
+
+    from . import config
+    if args.trace:
+        config.TRACE_FILE = args.trace
+    if args.no_profiles:
+        config.STUDENT_PROFILES = False
+    router = ModelRouter.from_file(args.routing) if args.routing else None
+    agent = TutoringAgent(router=router)
+    if args.drafts:
+        agent.n_drafts = args.drafts
+    agent.run_all_sessions(args.set)
+
+
+def cmd_warmup(args):
+    from . import config
+    from .api_client import KnowunityAPI
+    from .llm_client_improved import LLMClientV3
+    from .warmup import ContentBank, collect_topics, warm_up
+
+    api = KnowunityAPI()
+    bank = ContentBank(args.bank or config.CONTENT_BANK_FILE)
+    if args.refresh:
+        bank.topics = {}
+    topics = collect_topics(api, api.get_students(args.set))
+    warm_up(LLMClientV3(), bank, [t for ts in topics.values() for t in ts])
+
+
+def cmd_grade(args):
+    from .batch_grader import main as grade_main
+    grade_main(args.args)
+
+
+def cmd_trace_summary(args):
+    from .tracing import main as summary_main
+    summary_main(args.args)
+
+
+def cmd_experiment(args):
+    from .experiments import main as experiment_main
+    experiment_main(args.args)
+
+
+PASSTHROUGH = {"grade": cmd_grade, "trace-summary": cmd_trace_summary, "experiment": cmd_experiment}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from . import __version__
+
+    parser = argparse.ArgumentParser(prog="python -m src", description="Knowunity AI Tutor Agent")
+    parser.add_argument("--version", action="version", version=__version__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Tutor every student/topic in a set and submit predictions")
+    run.add_argument("--set", default="mini_dev", choices=["mini_dev", "dev", "eval"])
+    run.add_argument("--routing", help="JSON file overriding per-call-site model routes")
+    run.add_argument("--trace", help="Write per-turn spans to this Chrome trace JSON file")
+    run.add_argument("--drafts", type=int, help="Tutoring drafts per turn, picked by the local selector")
+    run.add_argument("--no-profiles", action="store_true",
+                     help="Ablation: don't reuse student profiles across a student's topics")
+    run.set_defaults(func=cmd_run)
+
+    warmup = sub.add_parser("warmup", help="Pre-generate the per-topic opening/diagnostic bank for a set")
+    warmup.add_argument("--set", default="mini_dev", choices=["mini_dev", "dev", "eval"])
+    warmup.add_argument("--bank", help="Bank JSON file (default: CONTENT_BANK_FILE)")
+    warmup.add_argument("--refresh", action="store_true", help="Regenerate topics already in the bank")
+    warmup.set_defaults(func=cmd_warmup)
+
+    # Parsed by their own modules; registered here for --help
+    sub.add_parser("grade", help="Batch-grade stored transcripts with QualityJudge")
+    sub.add_parser("trace-summary", help="Rank critical-path contributors in a --trace file")
+    sub.add_parser("experiment", help="Compare a matrix of prompt/detector/routing variants on one sample")
+
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Legacy entry points (run.py --set dev) default to "run"
+    if not argv or argv[0] not in COMMANDS and argv[0] not in ("-h", "--help", "--version"):
+        argv = ["run"] + argv
+    if argv[0] in PASSTHROUGH:
+        # Subcommands with their own parser get the rest of argv untouched (incl. --help)
+        return PASSTHROUGH[argv[0]](argparse.Namespace(args=argv[1:]))
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
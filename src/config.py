@@ -12,6 +12,47 @@ KNOWUNITY_BASE_URL = "https://knowunity-agent-olympics-2026-api.vercel.app"
 # OpenAI API (for intelligent responses)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Model routing: optional JSON file overriding per-call-site routes
+# e.g. {"judge": {"model": "gpt-5-mini", "max_tokens": 200}}
+MODEL_ROUTING_FILE = os.getenv("MODEL_ROUTING_FILE")
+
+# LLM deadlines & hedging
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "45"))
+LLM_HEDGING = os.getenv("LLM_HEDGING", "0") == "1"
+HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", "0.1"))  # Max fraction of calls that may hedge
+
+# Session transcripts (SQLite store); empty string disables
+TRANSCRIPT_DB = os.getenv("TRANSCRIPT_DB", "transcripts.sqlite")
+
+# Span tracing (Chrome trace JSON); unset disables tracing
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+# Tutoring drafts per turn; >1 picks the best locally and skips the judge when it passes
+MULTI_DRAFT_N = int(os.getenv("MULTI_DRAFT_N", "1"))
+
+# Warm-up bank of per-topic openings/diagnostics (JSON, reused across runs); empty disables
+CONTENT_BANK_FILE = os.getenv("CONTENT_BANK_FILE", "content_bank.json")
+
+# Session prefetch: open the next K sessions' conversations while one runs. Off by default:
+# the API doesn't document whether opening conversations for the same student K sessions early
+# is safe, and a stopped run leaves up to K started conversations behind that evaluate_tutoring
+# may score.
+PREFETCH_START_CONVERSATION = os.getenv("PREFETCH_START_CONVERSATION", "0") == "1"
+# Sessions prepared ahead (0 = inline). Without early starts, preparing is only local setup
+# (microseconds), so a prefetch pool buys nothing and defaults to off.
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "2" if PREFETCH_START_CONVERSATION else "0"))
+
+# LLM circuit breaker: trips on error/slow-call rate, probes again after the cooldown.
+# A call is slow once it uses this fraction of its route's timeout (tutor: 30s -> 20s)
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_FRACTION = float(os.getenv("BREAKER_SLOW_FRACTION", "0.67"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+
+# Per-run student profiles: reuse personality/level prior across a student's topics (0 = ablation)
+STUDENT_PROFILES = os.getenv("STUDENT_PROFILES", "1") == "1"
+# Prior strength needed to shorten assessment; the default needs 2+ agreeing same-subject sessions
+PROFILE_STRONG_PRIOR = float(os.getenv("PROFILE_STRONG_PRIOR", "0.85"))
+
 # Agent Settings
 MAX_TURNS = 10
 ASSESSMENT_TURNS = 3      # Turns 1-3 for assessment
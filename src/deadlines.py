@@ -0,0 +1,121 @@
+"""Deadlines & Hedging: Bounding LLM Tail Latency"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .model_routing import percentile
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an LLM call cannot finish before the active deadline"""
+
+
+class DeadlineScope:
+    """Thread-local absolute deadline shared by every LLM call inside a `with` block"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @contextmanager
+    def __call__(self, seconds: Optional[float]):
+        previous = getattr(self._local, "deadline", None)
+        deadline = time.monotonic() + seconds if seconds else None
+        # Nested scopes can only tighten the deadline
+        if previous is not None and (deadline is None or previous < deadline):
+            deadline = previous
+        self._local.deadline = deadline
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def remaining(self) -> Optional[float]:
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    def budget(self, timeout: float) -> float:
+        """Effective timeout for the next call, raising if the deadline already passed"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("turn deadline already passed")
+        return min(timeout, remaining)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return percentile(values, q) if values else 0.0
+
+
+class HedgePolicy:
+    """Decides when to send a duplicate request and tracks tail latency with/without it"""
+
+    def __init__(self, enabled: bool = False, max_rate: float = 0.1):
+        self.enabled = enabled
+        self.max_rate = max_rate  # Max fraction of calls allowed to hedge
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.abandoned = 0  # Losing attempts left running after the winner returned
+        self.hedged_latencies: List[float] = []    # What the caller waited
+        self.primary_latencies: List[float] = []   # What the first attempt alone took
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, p95: Optional[float]) -> Optional[float]:
+        """Seconds to wait on the first attempt before hedging, or None to never hedge.
+
+        `p95` is None until the site has SiteStats.MIN_SAMPLES calls, so there is
+        no separate sample-count check here.
+        """
+        if not self.enabled or p95 is None:
+            return None
+        return p95
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.max_rate * max(self.calls, 1):
+                return False
+            self.hedges += 1
+            return True
+
+    def record_call(self, seconds: float, hedge_won: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.hedged_latencies.append(seconds)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def record_abandoned(self):
+        with self._lock:
+            self.abandoned += 1
+
+    def record_primary(self, seconds: float):
+        with self._lock:
+            self.primary_latencies.append(seconds)
+
+    def report(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "abandoned": self.abandoned,
+                "p50_without_hedging": _percentile(self.primary_latencies, 0.50),
+                "p95_without_hedging": _percentile(self.primary_latencies, 0.95),
+                "p99_without_hedging": _percentile(self.primary_latencies, 0.99),
+                "p50_with_hedging": _percentile(self.hedged_latencies, 0.50),
+                "p95_with_hedging": _percentile(self.hedged_latencies, 0.95),
+                "p99_with_hedging": _percentile(self.hedged_latencies, 0.99),
+            }
+
+    def format_report(self) -> str:
+        r = self.report()
+        return (f"hedges {r['hedges']}/{r['calls']} ({r['hedge_rate']:.0%}), wins {r['hedge_wins']}, "
+                f"{r['abandoned']} losers left running (not cancellable) | "
+                f"p95 {r['p95_without_hedging']:.2f}s -> {r['p95_with_hedging']:.2f}s | "
+                f"p99 {r['p99_without_hedging']:.2f}s -> {r['p99_with_hedging']:.2f}s")
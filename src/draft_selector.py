@@ -0,0 +1,116 @@
+"""Draft Selector: Local Scoring of Candidate Tutor Responses"""
+
+import re
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+EMOJI_RE = re.compile("[\U0001F300-\U0001FAFF\u2600-\u27BF\u2B50]")
+
+# Phrases the tutoring prompt forbids
+ROBOTIC_PHRASES = ["you are spot on", "technically accurate", "can you explain", "good job"]
+
+REPEAT_THRESHOLD = 0.8  # SequenceMatcher ratio above which a draft counts as a repeat
+
+
+class DraftSelector:
+    """Picks the best of N drafts with the same checks the judge applies, without an LLM call"""
+
+    # Question + emoji rules met with no penalties: safe to skip the judge
+    ACCEPT_SCORE = 4
+
+    def score(self, draft: str, level: int, student_name: str, recent_tutor_msgs: List[str]) -> Tuple[int, List[str]]:
+        text = draft.strip()
+        lower = text.lower()
+        score, issues = 0, []
+
+        # 1. Must end with a question (mandatory in judge + self-eval prompts)
+        if text.endswith("?"):
+            score += 3
+        else:
+            issues.append("no question")
+
+        # 2. Uses the student's name
+        if student_name and student_name.lower() in lower:
+            score += 1
+        else:
+            issues.append("no name")
+
+        # 3. Emoji rules: none for Level 5, sparing otherwise
+        emojis = len(EMOJI_RE.findall(text))
+        if level >= 5 and emojis:
+            score -= 5
+            issues.append("emoji at L5")
+        elif emojis > 2:
+            score -= 1
+            issues.append("too many emojis")
+        else:
+            score += 1
+
+        # 4. Not a repeat of recent tutor lines
+        if any(SequenceMatcher(None, lower, prev.lower()).ratio() > REPEAT_THRESHOLD for prev in recent_tutor_msgs):
+            score -= 3
+            issues.append("repeats earlier turn")
+
+        # 5. Forbidden robotic phrasing
+        robotic = sum(1 for p in ROBOTIC_PHRASES if p in lower)
+        if robotic:
+            score -= robotic
+            issues.append("robotic phrasing")
+
+        return score, issues
+
+    def select(self, drafts: List[str], level: int, student_name: str,
+               recent_tutor_msgs: List[str]) -> Tuple[Optional[str], int, List[str]]:
+        best, best_score, best_issues = None, None, []
+        for draft in drafts:
+            if not draft or not draft.strip():
+                continue
+            score, issues = self.score(draft, level, student_name, recent_tutor_msgs)
+            if best_score is None or score > best_score:
+                best, best_score, best_issues = draft.strip(), score, issues
+        return best, best_score or 0, best_issues
+
+
+class SelectionStats:
+    """Run-wide comparison of the multi-draft path against draft -> judge"""
+
+    def __init__(self):
+        self.multi_turns = 0
+        self.judge_skipped = 0
+        self.judge_fallbacks = 0
+        self.multi_latency = 0.0
+        self.single_turns = 0
+        self.single_latency = 0.0
+        self.issues: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_multi(self, seconds: float, judged: bool, issues: List[str]):
+        with self._lock:
+            self.multi_turns += 1
+            self.multi_latency += seconds
+            if judged:
+                self.judge_fallbacks += 1
+            else:
+                self.judge_skipped += 1
+            for issue in issues:
+                self.issues[issue] = self.issues.get(issue, 0) + 1
+
+    def record_single(self, seconds: float):
+        with self._lock:
+            self.single_turns += 1
+            self.single_latency += seconds
+
+    def format_report(self) -> str:
+        with self._lock:
+            parts = []
+            if self.multi_turns:
+                parts.append(f"multi-draft {self.multi_turns} turns, judge skipped {self.judge_skipped} "
+                             f"({self.judge_skipped / self.multi_turns:.0%}), "
+                             f"avg {self.multi_latency / self.multi_turns:.2f}s")
+            if self.single_turns:
+                parts.append(f"draft->judge {self.single_turns} turns, "
+                             f"avg {self.single_latency / self.single_turns:.2f}s")
+            if self.issues:
+                parts.append("issues of picked drafts: " + ", ".join(f"{k} x{v}" for k, v in self.issues.items()))
+            return " | ".join(parts) or "no tutoring turns"
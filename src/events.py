@@ -0,0 +1,118 @@
+"""Event Frames: Batching Agent Events & Logs off the Hot Path"""
+
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+_STOP = object()
+
+
+class EventBatcher:
+    """Coalesces agent events into frames bounded by time and size.
+
+    `emit` only enqueues, so the agent thread never waits on the consumer. A
+    background thread sends `{"type": "frame", "events": [...]}` to `sink` at most
+    every `interval` seconds (or sooner once `max_events` are pending). Within a
+    frame only the newest `state_update` is kept, since each one carries the full
+    conversation state.
+    """
+
+    def __init__(self, sink: Callable[[Dict], None], interval: float = 0.25, max_events: int = 200):
+        self.sink = sink
+        self.interval = interval
+        self.max_events = max_events
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="event-batcher", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: Dict):
+        self._queue.put(event)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            events = [first]
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(events) < self.max_events:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stop = True
+                    break
+                events.append(event)
+            self.sink({"type": "frame", "events": self._coalesce(events)})
+            if stop:
+                return
+
+    @staticmethod
+    def _coalesce(events: List[Dict]) -> List[Dict]:
+        last_state = max((i for i, e in enumerate(events) if e.get("type") == "state_update"), default=None)
+        return [e for i, e in enumerate(events) if e.get("type") != "state_update" or i == last_state]
+
+
+class ConsoleSink:
+    """Non-blocking stdout: lines are queued and written in batches by a daemon thread"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="console-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str):
+        self._queue.put(line)
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    def flush(self):
+        """Block until every queued line has been written"""
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.5):
+            if not self._thread.is_alive():
+                break  # Writer died; don't hang the caller
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            lines = []
+            while True:
+                if item is _STOP:
+                    self._write(lines)
+                    return
+                if isinstance(item, threading.Event):
+                    self._write(lines)
+                    lines = []
+                    item.set()
+                else:
+                    lines.append(item)
+                try:
+                    item = self._queue.get_nowait()  # Drain whatever piled up meanwhile
+                except queue.Empty:
+                    break
+            self._write(lines)
+
+    def _write(self, lines: List[str]):
+        if lines:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass  # Closed/broken stream: drop the lines, keep the writer (and flush()) alive
@@ -0,0 +1,318 @@
+"""Experiments: Variant Matrix Runs Over a Shared Student/Topic Sample
+
+Usage: python -m src experiment matrix.json --workers 4
+
+Matrix file:
+    {
+      "set": "mini_dev",
+      "sample": 8,
+      "variants": {
+        "baseline": {},
+        "short-assess": {"turns": {"assess": 2, "tutor": 6}},
+        "strict-final": {"detector": {"FINAL_CUTOFFS": [1.5, 2.5, 3.5, 4.5]}},
+        "more-mastery": {"rules": {"EXTREME_MASTERY": ["derivative", "integral", "eigen"]}},
+        "mini-judge": {"routing": {"judge": {"model": "gpt-5-mini"}}},
+        "level-v2": {"prompts": {"LEVEL_ANALYSIS_PROMPT": "@prompts/level_v2.txt"}},
+        "drafts": {"config": {"MULTI_DRAFT_N": 3}}
+      }
+    }
+
+Each variant runs in its own process (overrides are module globals), all on
+the same sample fetched once by the parent. A cell is keyed by the resolved
+variant spec + sample, so rerunning after adding a variant only runs the new one.
+
+Every cell opens its own conversations for the sample and submits its
+predictions, i.e. uses one MSE submission of the set. Cells only run side by
+side on mini_dev (unlimited); dev needs --allow-dev and runs cells one at a
+time, and eval (3 submissions) is refused.
+"""
+
+import argparse
+import csv
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Spec key -> (module, class) whose attributes the variant overrides
+OVERRIDE_TARGETS = {
+    "prompts": (".prompts_improved", None),
+    "rules": (".level_inference_improved", "RuleValidator"),
+    "detector": (".level_inference_improved", "LLMFirstDetector"),
+    "config": (".config", None),
+}
+SPEC_KEYS = set(OVERRIDE_TARGETS) | {"routing", "turns"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    key TEXT PRIMARY KEY,
+    variant TEXT,
+    set_type TEXT,
+    sessions INTEGER,
+    mse REAL,
+    tutoring REAL,
+    llm_calls INTEGER,
+    tokens INTEGER,
+    wall_seconds REAL,
+    finished_at REAL
+);
+"""
+
+COLUMNS = ("variant", "sessions", "mse", "tutoring", "llm_calls", "tokens", "wall_seconds", "cached")
+
+
+# ============ MATRIX ============
+
+def _target(key: str):
+    module, cls = OVERRIDE_TARGETS[key]
+    target = importlib.import_module(module, __package__)
+    return getattr(target, cls) if cls else target
+
+
+def resolve_spec(spec: Dict, base_dir: str) -> Dict:
+    """Inline "@file" values and routing files so the cell key covers their contents"""
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown variant keys: {', '.join(sorted(unknown))} (expected {', '.join(sorted(SPEC_KEYS))})")
+
+    def load(value):
+        if isinstance(value, str) and value.startswith("@"):
+            with open(os.path.join(base_dir, value[1:]), encoding="utf-8") as f:
+                return f.read()
+        return value
+
+    resolved = {}
+    for key, overrides in spec.items():
+        if key == "routing" and isinstance(overrides, str):
+            with open(os.path.join(base_dir, overrides), encoding="utf-8") as f:
+                resolved[key] = json.load(f)
+        elif key in OVERRIDE_TARGETS:
+            target = _target(key)
+            for attr in overrides:
+                if not hasattr(target, attr):
+                    raise ValueError(f"Unknown {key} override: {attr}")
+            resolved[key] = {attr: load(value) for attr, value in overrides.items()}
+        else:
+            resolved[key] = overrides
+    return resolved
+
+
+def apply_overrides(spec: Dict):
+    """Patch module/class attributes for this process (one variant per process)"""
+    for key in OVERRIDE_TARGETS:
+        target = _target(key) if key in spec else None
+        for attr, value in spec.get(key, {}).items():
+            current = getattr(target, attr)
+            if isinstance(current, dict) and isinstance(value, dict):
+                # Merge so a variant can change one style profile without restating the rest
+                value = {k: {**current[k], **v} if isinstance(current.get(k), dict) and isinstance(v, dict) else v
+                         for k, v in {**current, **value}.items()}
+            elif isinstance(current, tuple) and isinstance(value, list):
+                value = tuple(value)
+            setattr(target, attr, value)
+
+
+def cell_key(spec: Dict, set_type: str, pairs: List[Tuple[Dict, Dict]], server_tutoring: bool) -> str:
+    payload = {
+        "spec": spec, "set": set_type, "server_tutoring": server_tutoring,
+        "sample": [(s["id"], t["id"]) for s, t in pairs],
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+# ============ CELLS ============
+
+class CellCache:
+    """SQLite file of finished cells; a cell is only run once per key"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM cells WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def put(self, key: str, variant: str, set_type: str, result: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, variant, set_type, result["sessions"], result["mse"], result["tutoring"],
+             result["llm_calls"], result["tokens"], result["wall_seconds"], time.time()))
+        self.conn.commit()
+
+
+def grade_transcripts(transcript_db: str, results_db: str) -> Optional[float]:
+    """Mean QualityJudge score (1-10) over a cell's tutor turns, with default routing for every cell"""
+    from .batch_grader import BatchGrader, ResultsDB, iter_turn_jobs
+    from .judge import QualityJudge
+    from .llm_client_improved import LLMClientV3
+    from .model_routing import ModelRouter
+    from .transcripts import iter_transcripts
+
+    db = ResultsDB(results_db)
+    BatchGrader(QualityJudge(LLMClientV3(router=ModelRouter())), db).run(
+        iter_turn_jobs(iter_transcripts([transcript_db]), db))
+    return db.conn.execute("SELECT AVG(score) FROM turn_scores WHERE score IS NOT NULL").fetchone()[0]
+
+
+def run_cell(name: str, key: str, spec: Dict, set_type: str, pairs: List[Tuple[Dict, Dict]],
+             workdir: str, server_tutoring: bool) -> Dict:
+    """Worker process: one variant over the shared sample"""
+    stem = os.path.join(workdir, f"{name}-{key[:8]}")
+    with open(stem + ".log", "w", encoding="utf-8") as log:
+        # Cells run side by side; keep each one's console output in its own file
+        sys.stdout = log
+        try:
+            return _run_cell(stem, spec, set_type, pairs, server_tutoring)
+        finally:
+            sys.stdout = sys.__stdout__
+
+
+def _run_cell(stem: str, spec: Dict, set_type: str, pairs: List[Tuple[Dict, Dict]], server_tutoring: bool) -> Dict:
+    from . import config
+    apply_overrides(spec)
+    for suffix in (".sqlite", ".sqlite-wal", ".sqlite-shm", ".grades.sqlite"):
+        if os.path.exists(stem + suffix):
+            os.remove(stem + suffix)  # Leftovers of an interrupted run of this cell
+    config.TRANSCRIPT_DB = stem + ".sqlite"
+
+    from .agent_improved import TutoringAgent
+    from .model_routing import ModelRouter
+
+    agent = TutoringAgent(router=ModelRouter.from_dict(spec["routing"]) if spec.get("routing") else None)
+    turns = spec.get("turns", {})
+    agent.ASSESS_TURNS = agent.profiles.assess_turns = turns.get("assess", agent.ASSESS_TURNS)
+    agent.TUTOR_TURNS = turns.get("tutor", agent.TUTOR_TURNS)
+
+    start = time.perf_counter()
+    try:
+        result = agent.run_pairs(pairs, set_type, evaluate_tutoring=server_tutoring)
+    finally:
+        agent.log_run_report()
+    result["wall_seconds"] = time.perf_counter() - start
+
+    usage = agent.llm.router.report().values()
+    result["llm_calls"] = sum(r["calls"] for r in usage)
+    result["tokens"] = sum(r["prompt_tokens"] + r["completion_tokens"] for r in usage)
+    if not server_tutoring:
+        agent.transcripts.close()
+        result["tutoring"] = grade_transcripts(config.TRANSCRIPT_DB, stem + ".grades.sqlite")
+    return result
+
+
+# ============ RUNNER ============
+
+def load_sample(set_type: str, sample: Optional[int]) -> List[Tuple[Dict, Dict]]:
+    """Catalog fetched once in the parent and shared by every cell"""
+    from .api_client import KnowunityAPI
+    from .warmup import collect_topics
+
+    api = KnowunityAPI()
+    students = api.get_students(set_type)
+    topics = collect_topics(api, students)
+    pairs = [(s, t) for s in students for t in topics[s["id"]]]
+    return pairs[:sample] if sample else pairs
+
+
+def warm_bank(pairs: List[Tuple[Dict, Dict]]):
+    """Fill the shared content bank up front so cells only read it"""
+    from . import config
+    if not config.CONTENT_BANK_FILE:
+        return
+    from .llm_client_improved import LLMClientV3
+    from .warmup import ContentBank, warm_up
+    warm_up(LLMClientV3(), ContentBank(config.CONTENT_BANK_FILE), [t for _, t in pairs])
+
+
+def format_table(rows: List[Dict]) -> str:
+    lines = [f"{'variant':<20} {'sessions':>8} {'MSE':>7} {'tutoring':>8} {'LLM calls':>9} "
+             f"{'tokens':>9} {'wall s':>7}"]
+    for r in rows:
+        mse = f"{r['mse']:.3f}" if r["mse"] is not None else "-"
+        tutoring = f"{r['tutoring']:.2f}" if r["tutoring"] is not None else "-"
+        lines.append(f"{r['variant'] + ('*' if r['cached'] else ''):<20} {r['sessions']:>8} {mse:>7} "
+                     f"{tutoring:>8} {r['llm_calls']:>9} {r['tokens']:>9} {r['wall_seconds']:>7.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src experiment",
+                                     description="Run a matrix of agent variants over one shared sample")
+    parser.add_argument("matrix", help="JSON file with set, sample and named variants")
+    parser.add_argument("--workers", type=int, default=4, help="Variants run concurrently")
+    parser.add_argument("--workdir", default="experiments", help="Cell cache, transcripts and logs")
+    parser.add_argument("--out", help="CSV comparison table (default: <workdir>/results.csv)")
+    parser.add_argument("--only", nargs="+", metavar="VARIANT", help="Run a subset of the matrix")
+    parser.add_argument("--rerun", nargs="+", default=[], metavar="VARIANT", help="Ignore cached cells")
+    parser.add_argument("--server-tutoring", action="store_true",
+                        help="Score tutoring with the API's set-wide evaluation (forces --workers 1)")
+    parser.add_argument("--allow-dev", action="store_true",
+                        help="Allow a dev matrix: each cell uses one dev submission (forces --workers 1)")
+    args = parser.parse_args(argv)
+
+    with open(args.matrix, encoding="utf-8") as f:
+        matrix = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(args.matrix))
+    set_type = matrix.get("set", "mini_dev")
+    if set_type == "eval":
+        parser.error("refusing to run a matrix on eval: every cell submits predictions and eval allows 3")
+    if set_type != "mini_dev" and not args.allow_dev:
+        parser.error(f"every cell submits predictions to {set_type}; pass --allow-dev to spend one submission per cell")
+    variants = {name: resolve_spec(spec, base_dir) for name, spec in matrix["variants"].items()
+                if not args.only or name in args.only}
+    # Off mini_dev, run cells (and so their conversations and submissions) one at a time
+    workers = 1 if args.server_tutoring or set_type != "mini_dev" else args.workers
+
+    os.makedirs(args.workdir, exist_ok=True)
+    cache = CellCache(os.path.join(args.workdir, "cells.sqlite"))
+    pairs = load_sample(set_type, matrix.get("sample"))
+    print(f"🧪 {len(variants)} variants x {len(pairs)} sessions ({set_type})")
+
+    keys = {name: cell_key(spec, set_type, pairs, args.server_tutoring) for name, spec in variants.items()}
+    results, todo = {}, []
+    for name in variants:
+        cached = None if name in args.rerun else cache.get(keys[name])
+        if cached:
+            results[name] = {**cached, "variant": name, "cached": True}
+        else:
+            todo.append(name)
+    print(f"   {len(results)} cached, {len(todo)} to run")
+    if todo and set_type != "mini_dev":
+        print(f"⚠️ {len(todo)} cells will use {len(todo)} {set_type} submissions, one cell at a time")
+
+    if todo:
+        warm_bank(pairs)
+        # One fresh process per cell: overrides patch module globals and must not leak into the next cell
+        with multiprocessing.Pool(processes=min(workers, len(todo)), maxtasksperchild=1) as pool:
+            pending = {name: pool.apply_async(run_cell, (name, keys[name], variants[name], set_type, pairs,
+                                                         args.workdir, args.server_tutoring)) for name in todo}
+            for name, cell in pending.items():
+                try:
+                    result = cell.get()
+                except Exception as e:
+                    print(f"❌ {name} failed: {e} (see {args.workdir}/{name}-{keys[name][:8]}.log)")
+                    continue
+                cache.put(keys[name], name, set_type, result)
+                results[name] = {**result, "variant": name, "cached": False}
+                print(f"✅ {name} done in {result['wall_seconds']:.0f}s")
+
+    rows = [results[name] for name in variants if name in results]
+    print(format_table(rows))
+    print("(* cached; tutoring = " + ("API score" if args.server_tutoring else "mean QualityJudge score, 1-10") + ")")
+
+    out = args.out or os.path.join(args.workdir, "results.csv")
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"📄 Comparison table written to {out}")
+
+
+if __name__ == "__main__":
+    main()
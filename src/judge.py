@@ -1,11 +1,13 @@
 """External Judge: Gatekeeper & Self-Evaluator"""
 
-from prompts_improved import get_judge_prompt, get_self_eval_prompt
+from .prompts_improved import get_judge_prompt, get_self_eval_prompt
+from .tracing import traced
 
 class QualityJudge:
     def __init__(self, llm_client):
         self.llm = llm_client
 
+    @traced("judge.verify")
     def verify(self, draft_response: str, topic: str, level: int, last_student_msg: str) -> str:
         """Gatekeeper: Rewrites bad responses"""
         if len(draft_response.split()) < 8: return draft_response
@@ -16,8 +18,8 @@ class QualityJudge:
             critique = self.llm.chat(
                 system_prompt=prompt, 
                 user_message=f"Candidate Response: \"{draft_response}\"", 
-                max_tokens=300,
-                temperature=0.0
+                temperature=0.0,
+                site="judge"
             )
             
             if critique.strip().startswith("PASS"):
@@ -32,20 +34,21 @@ class QualityJudge:
             return draft_response
             
         except Exception as e:
-            print(f"Judge Error: {e}")
+            self.llm.log(f"Judge Error: {e}", "error")
             return draft_response
 
+    @traced("judge.grade")
     def grade_response(self, response: str, topic: str, level: int, student_name: str, last_student_msg: str) -> str:
         """Self-Evaluator: Returns a score and critique string"""
         prompt = get_self_eval_prompt(topic, level, student_name, last_student_msg)
         
         try:
-            # Quick check (Max 100 tokens to save cost/time)
+            # Quick check (small token budget from the "grade" route)
             eval_result = self.llm.chat(
                 system_prompt=prompt,
                 user_message=f"Tutor Response: \"{response}\"",
-                max_tokens=100,
-                temperature=0.0
+                temperature=0.0,
+                site="grade"
             )
             return eval_result.replace("\n", " | ")
         except Exception:
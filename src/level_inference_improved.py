@@ -2,6 +2,8 @@
 
 import re
 from typing import Dict, Tuple, Optional
+from .transcripts import Message, TUTOR, STUDENT
+from .tracing import traced
 
 class RuleValidator:
     """Fast rule-based validation to catch extreme cases"""
@@ -37,35 +39,71 @@ class RuleValidator:
             return (4.5, 5.0)
         return None
 
+    def estimate(self, analysis: Dict, estimates_history: list) -> Tuple[float, float]:
+        """Rule-only estimate, used when the LLM is unavailable (degraded mode)"""
+        constraint = self.get_constraint(analysis)
+        if constraint:
+            return (constraint[0] + constraint[1]) / 2, 0.6
+        if analysis["mastery"] == 1:
+            return 3.5, 0.3
+        if estimates_history:
+            return estimates_history[-1]["level"], 0.3
+        return 3.0, 0.2
+
 class LLMFirstDetector:
+    # get_final_prediction thresholds (class attributes so experiments can vary them)
+    EXTREME_CUTOFFS = (1.5, 4.5)            # Avg of last 3 estimates at/beyond these -> Level 1 / 5
+    FINAL_CUTOFFS = (1.6, 2.6, 3.6, 4.6)    # Full-average boundaries between Levels 1..5
+
     def __init__(self, llm_client):
         self.llm_client = llm_client
         self.validator = RuleValidator()
         self.conversation_history = []
         self.topic = ""
         self.estimates_history = []
+        self.prior = None
+        self.skip_llm_turns = 0
+        self.llm_calls_saved = 0
+        self.rules_only_turns = 0  # Estimates made without the LLM (circuit open / call failed)
     
     def set_topic(self, topic: str):
         self.topic = topic
+
+    def set_prior(self, level: float, confidence: float, skip_llm_turns: int = 0):
+        """Level carried over from this student's earlier sessions.
+
+        For the first `skip_llm_turns` turns the prior replaces the LLM analysis;
+        afterwards it only anchors the inertia step until estimates accumulate.
+        """
+        self.prior = {"level": level, "confidence": confidence}
+        self.skip_llm_turns = skip_llm_turns
     
     def add_exchange(self, tutor_msg: str, student_msg: str):
-        self.conversation_history.append({"role": "tutor", "content": tutor_msg})
-        self.conversation_history.append({"role": "student", "content": student_msg})
+        self.conversation_history.append(Message(TUTOR, tutor_msg))
+        self.conversation_history.append(Message(STUDENT, student_msg))
     
+    @traced("detector.estimate")
     def get_estimate(self, turn_number: int) -> Tuple[float, float]:
         context = self.conversation_history if turn_number <= 3 else self.conversation_history[-8:]
         
-        # 1. LLM Analysis
-        try:
-            llm_result = self.llm_client.analyze_level(context, self.topic, turn_number)
-            level = llm_result.get("level", 3.0)
-            conf = llm_result.get("confidence", 0.5)
-        except Exception:
-            level, conf = 3.0, 0.0
+        last_msg = self.conversation_history[-1].content
+        analysis = self.validator.analyze(last_msg)
+
+        # 1. LLM Analysis (rules alone when the LLM is down / circuit open)
+        if turn_number <= self.skip_llm_turns:
+            # Strong prior from this student's earlier sessions stands in for the LLM
+            level, conf = self.prior["level"], self.prior["confidence"]
+            self.llm_calls_saved += 1
+        else:
+            try:
+                llm_result = self.llm_client.analyze_level(context, self.topic, turn_number)
+                level = llm_result.get("level", 3.0)
+                conf = llm_result.get("confidence", 0.5)
+            except Exception:
+                level, conf = self.validator.estimate(analysis, self.estimates_history)
+                self.rules_only_turns += 1
         
         # 2. Rule Validation (Safety Net)
-        last_msg = self.conversation_history[-1]["content"]
-        analysis = self.validator.analyze(last_msg)
         constraint = self.validator.get_constraint(analysis)
         
         if constraint:
@@ -82,10 +120,10 @@ class LLMFirstDetector:
             self.estimates_history.append({"level": level, "confidence": conf})
             return level, conf
 
-        # 4. Inertia (Only applies to non-extremes)
-        if self.estimates_history:
-            prev_level = self.estimates_history[-1]["level"]
-            avg_history = sum(e["level"] for e in self.estimates_history) / len(self.estimates_history)
+        # 4. Inertia (Only applies to non-extremes; the prior anchors it before any history)
+        anchors = self.estimates_history or ([self.prior] if self.prior else [])
+        if anchors:
+            avg_history = sum(e["level"] for e in anchors) / len(anchors)
             
             if abs(level - avg_history) > 1.0:
                 if conf < 0.9:
@@ -101,15 +139,14 @@ class LLMFirstDetector:
         last_3 = [e["level"] for e in self.estimates_history[-3:]]
         avg_last_3 = sum(last_3) / len(last_3)
         
-        if avg_last_3 <= 1.5: return 1
-        if avg_last_3 >= 4.5: return 5
+        low, high = self.EXTREME_CUTOFFS
+        if avg_last_3 <= low: return 1
+        if avg_last_3 >= high: return 5
         
         # Otherwise use full average
         levels = [e["level"] for e in self.estimates_history]
         avg_level = sum(levels) / len(levels)
         
-        if avg_level < 1.6: return 1
-        if avg_level < 2.6: return 2
-        if avg_level < 3.6: return 3
-        if avg_level < 4.6: return 4
+        for level, cutoff in enumerate(self.FINAL_CUTOFFS, start=1):
+            if avg_level < cutoff: return level
         return 5
\ No newline at end of file
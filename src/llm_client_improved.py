@@ -1,38 +1,161 @@
 """LLM Client v3: Optimized for Quality"""
 
 import openai
-import config
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional
+from . import config
+from .model_routing import ModelRouter, print_log
+from .deadlines import DeadlineScope, DeadlineExceeded, HedgePolicy
+from .circuit_breaker import CircuitBreaker, CircuitOpen
+from .tracing import span, traced
+
+# Worth another attempt if the deadline leaves room (timeouts are not: they used up the budget)
+RETRYABLE = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
 
 class LLMClientV3:
     """Handles all LLM interactions with optimized prompts"""
+
+    MAX_RETRIES = 2
+    RETRY_BACKOFF = 0.5  # Seconds, doubled per retry
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
-        self.model = "gpt-5.2"  # Fast and high quality
+    def __init__(self, router: Optional[ModelRouter] = None, hedge: Optional[HedgePolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        # SDK retries are off: they would re-send timed-out requests and overrun the deadline.
+        # _complete retries itself, inside the deadline budget.
+        self.client = openai.OpenAI(api_key=config.OPENAI_API_KEY, max_retries=0)
+        if router is None:
+            router = ModelRouter.from_file(config.MODEL_ROUTING_FILE) if config.MODEL_ROUTING_FILE else ModelRouter()
+        self.router = router
+        self.hedge = hedge or HedgePolicy(enabled=config.LLM_HEDGING, max_rate=config.HEDGE_MAX_RATE)
+        self.deadline = DeadlineScope()
+        self.breaker = breaker or CircuitBreaker(
+            error_rate=config.BREAKER_ERROR_RATE,
+            slow_fraction=config.BREAKER_SLOW_FRACTION,
+            cooldown=config.BREAKER_COOLDOWN_SECONDS,
+        )
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+        self.log = print_log  # The agent points this at its non-blocking console/event log
     
-    def chat(self, system_prompt: str, user_message: str, max_tokens: int = 1024, temperature: float = 0.7) -> str:
-        """Send a message to OpenAI and get response"""
+    def close(self):
+        """Release the hedging pool (attempts still in flight finish on their own)"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def chat(self, system_prompt: str, user_message: str, max_tokens: Optional[int] = None,
+             temperature: float = 0.7, site: str = "default") -> str:
+        """Send a message to OpenAI and get response (model/budget chosen by call site)"""
+        return self._complete(system_prompt, user_message, max_tokens, temperature, site)[0]
+
+    def chat_n(self, system_prompt: str, user_message: str, n: int, max_tokens: Optional[int] = None,
+               temperature: float = 0.9, site: str = "default") -> List[str]:
+        """N independent candidates from a single request (provider `n` parameter)"""
+        return self._complete(system_prompt, user_message, max_tokens, temperature, site, n=n)
+
+    def _complete(self, system_prompt: str, user_message: str, max_tokens: Optional[int],
+                  temperature: float, site: str, n: int = 1) -> List[str]:
+        route = self.router.route(site)
+        kwargs = dict(
+            max_completion_tokens=max_tokens or route.max_tokens,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ]
+        )
+        if n > 1:
+            kwargs["n"] = n
+
+        self.deadline.budget(route.timeout)  # Turn deadline already gone: fail before touching the breaker
+        if not self.breaker.allow():
+            raise CircuitOpen(f"LLM circuit open, skipping {site} call")
+
+        p95, _ = self.router.observed_p95(site)
+        hedge_delay = self.hedge.hedge_delay(p95)
+        start = time.perf_counter()
+        # The route timeout bounds the whole call, retries included (and a turn deadline can tighten it)
+        with span("llm.chat", site=site, model=self.router.model_for(site), n=n), self.deadline(route.timeout):
+            try:
+                result = self._with_retries(site, route.timeout, hedge_delay, kwargs)
+            except Exception:
+                self.breaker.record(time.perf_counter() - start, route.timeout, error=True)
+                raise
+        self.breaker.record(time.perf_counter() - start, route.timeout)
+        return result
+
+    def _with_retries(self, site: str, route_timeout: float, hedge_delay: Optional[float], kwargs: dict) -> List[str]:
+        for attempt in range(self.MAX_RETRIES + 1):
+            timeout = self.deadline.budget(route_timeout)  # Raises DeadlineExceeded once spent
+            try:
+                if hedge_delay is None or hedge_delay >= timeout:
+                    return self._attempt(site, timeout, kwargs)
+                return self._hedged(site, timeout, hedge_delay, kwargs)
+            except RETRYABLE:
+                backoff = self.RETRY_BACKOFF * 2 ** attempt
+                remaining = self.deadline.remaining()
+                if attempt == self.MAX_RETRIES or remaining is None or remaining <= backoff:
+                    raise
+                time.sleep(backoff)
+
+    def _attempt(self, site: str, timeout: float, kwargs: dict) -> List[str]:
+        """One completion request, bounded by `timeout` seconds"""
+        model = self.router.model_for(site)
+        start = time.perf_counter()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_completion_tokens=max_tokens,
-                temperature=temperature,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ]
-            )
-            return response.choices[0].message.content
+            response = self.client.chat.completions.create(model=model, timeout=timeout, **kwargs)
+            self.router.record(site, model, time.perf_counter() - start, usage=response.usage)
+            return [choice.message.content for choice in response.choices]
+        except openai.APITimeoutError as e:
+            self.router.record(site, model, time.perf_counter() - start, error=True)
+            raise DeadlineExceeded(f"{site} call exceeded {timeout:.1f}s") from e
         except Exception as e:
-            print(f"OpenAI API Error: {e}")
+            self.router.record(site, model, time.perf_counter() - start, error=True)
+            self.log(f"OpenAI API Error: {e}", "error")
             raise
+
+    def _hedged(self, site: str, timeout: float, hedge_delay: float, kwargs: dict) -> List[str]:
+        """Send a duplicate request if the first is slower than the site's p95; first success wins"""
+        start = time.perf_counter()
+        primary = self._pool.submit(self._attempt, site, timeout, kwargs)
+        primary.add_done_callback(lambda f: self.hedge.record_primary(time.perf_counter() - start))
+        attempts = [primary]
+
+        done, _ = wait(attempts, timeout=hedge_delay)
+        if not done and self.hedge.try_acquire():
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining > 0:
+                attempts.append(self._pool.submit(self._attempt, site, remaining, kwargs))
+
+        pending = set(attempts)
+        error = None
+        while pending:
+            remaining = timeout - (time.perf_counter() - start)
+            done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    # cancel() only stops attempts still queued; a loser already in flight
+                    # can't be aborted and runs on (bounded by its timeout), counted as abandoned
+                    for other in pending:
+                        if not other.cancel():
+                            self.hedge.record_abandoned()
+                    self.hedge.record_call(time.perf_counter() - start, hedge_won=future is not primary)
+                    return future.result()
+                error = future.exception()
+
+        self.hedge.record_call(time.perf_counter() - start)
+        if error is not None and not isinstance(error, DeadlineExceeded):
+            raise error
+        raise DeadlineExceeded(f"{site} call exceeded {timeout:.1f}s")
     
+    @traced("llm.analyze_level")
     def analyze_level(self, conversation_history: list, topic: str, turn_number: int) -> dict:
         """Analyze conversation to determine student level"""
         
-        from prompts_improved import LEVEL_ANALYSIS_PROMPT
+        from .prompts_improved import LEVEL_ANALYSIS_PROMPT
         
         # Format conversation
         history_text = ""
@@ -59,8 +182,8 @@ Return ONLY valid JSON:"""
             response = self.chat(
                 LEVEL_ANALYSIS_PROMPT, 
                 user_msg, 
-                max_tokens=400,
-                temperature=0.3  # Lower temp for more consistent analysis
+                temperature=0.3,  # Lower temp for more consistent analysis
+                site="level"
             )
             
             # Extract JSON from response
@@ -73,16 +196,19 @@ Return ONLY valid JSON:"""
                 result["confidence"] = max(0.0, min(1.0, float(result.get("confidence", 0.5))))
                 
                 # Print reasoning for debugging
-                print(f"  📊 LLM Analysis: Level {result['level']:.1f} ({result['confidence']:.0%}) - {result.get('reasoning', '')[:80]}")
+                self.log(f"📊 LLM Analysis: Level {result['level']:.1f} ({result['confidence']:.0%}) - {result.get('reasoning', '')[:80]}")
                 
                 return result
             else:
-                print("  ⚠️  No JSON found in LLM response")
+                self.log("⚠️ No JSON found in LLM response", "error")
                 return {"level": 3.0, "confidence": 0.5, "reasoning": "Parse error"}
                 
+        except CircuitOpen:
+            raise  # Caller switches to rule-only estimation
         except json.JSONDecodeError as e:
-            print(f"  ⚠️  JSON parse error: {e}")
+            self.log(f"⚠️ JSON parse error: {e}", "error")
             return {"level": 3.0, "confidence": 0.5, "reasoning": "JSON parse error"}
         except Exception as e:
-            print(f"  ⚠️  LLM analysis error: {e}")
-            return {"level": 3.0, "confidence": 0.3, "reasoning": "API error"}
\ No newline at end of file
+            # No analysis at all: the caller estimates from rules (and counts the turn as rules-only)
+            self.log(f"⚠️ LLM analysis error: {e}", "error")
+            raise
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""Model Routing: Per-Call-Site Model, Budget & Latency SLO"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+# Call sites used across the agent
+SITES = ("tutor", "judge", "grade", "assess", "close", "level", "warmup")
+
+# USD per 1M tokens (input, output). Unknown models are reported with 0 spend.
+MODEL_PRICES = {
+    "gpt-5.2": (1.75, 14.00),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5-nano": (0.05, 0.40),
+}
+
+
+@dataclass
+class Route:
+    """How one call site talks to the LLM"""
+    model: str
+    max_tokens: int
+    timeout: float
+    slo_seconds: Optional[float] = None     # p95 target, None = never downgrade
+    fallback_model: Optional[str] = None    # Used once the SLO is breached
+
+
+DEFAULT_ROUTES = {
+    "tutor":   Route("gpt-5.2", 350, 30.0, slo_seconds=12.0, fallback_model="gpt-5-mini"),
+    "judge":   Route("gpt-5.2", 300, 20.0, slo_seconds=6.0, fallback_model="gpt-5-mini"),
+    "grade":   Route("gpt-5.2", 100, 20.0, slo_seconds=6.0, fallback_model="gpt-5-mini"),
+    "assess":  Route("gpt-5.2", 150, 20.0, slo_seconds=8.0, fallback_model="gpt-5-mini"),
+    "close":   Route("gpt-5.2", 150, 20.0, slo_seconds=8.0, fallback_model="gpt-5-mini"),
+    "level":   Route("gpt-5.2", 400, 25.0, slo_seconds=10.0, fallback_model="gpt-5-mini"),
+    "warmup":  Route("gpt-5.2", 1200, 60.0),
+    "default": Route("gpt-5.2", 1024, 60.0),
+}
+
+
+def print_log(message: str, type: str = "info"):
+    print(message)
+
+
+def percentile(values, q: float) -> float:
+    """Linearly interpolated percentile (numpy's default), so one outlier doesn't become the p95"""
+    ordered = sorted(values)
+    pos = q * (len(ordered) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class SiteStats:
+    """Rolling latency window plus lifetime totals for one call site"""
+
+    MIN_SAMPLES = 20  # No p95 from fewer calls than this
+
+    def __init__(self, window: int = 50):
+        self.latencies = deque(maxlen=window)
+        self.breaches = 0  # Consecutive calls that ended with p95 over the SLO
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.spend = 0.0
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        return percentile(self.latencies, 0.95)
+
+    def reset_window(self):
+        """Forget recent latencies (they belong to the model we just switched away from)"""
+        self.latencies.clear()
+        self.breaches = 0
+
+
+class ModelRouter:
+    """Maps call sites to routes and downgrades sites that keep breaching their SLO.
+
+    A downgrade needs the windowed p95 over the SLO for BREACH_CALLS calls in a
+    row; after UPGRADE_AFTER seconds the site goes back to its primary model.
+    """
+
+    BREACH_CALLS = 5
+    UPGRADE_AFTER = 300.0
+
+    def __init__(self, routes: Optional[Dict[str, Route]] = None):
+        self.routes = {site: Route(**asdict(route)) for site, route in DEFAULT_ROUTES.items()}
+        if routes:
+            self.routes.update(routes)
+        self.stats = {}
+        self.downgraded: Dict[str, float] = {}  # site -> monotonic time of the downgrade
+        self.log = print_log  # The agent points this at its non-blocking console/event log
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "ModelRouter":
+        """Load overrides from JSON: {"judge": {"model": "gpt-5-mini"}, ...}"""
+        with open(path) as f:
+            raw = json.load(f)
+        return cls.from_dict(raw)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Dict]) -> "ModelRouter":
+        unknown = set(raw) - set(SITES) - {"default"}
+        if unknown:
+            raise ValueError(f"Unknown routing sites: {', '.join(sorted(unknown))} "
+                             f"(expected {', '.join(SITES)} or default)")
+        routes = {}
+        for site, overrides in raw.items():
+            base = DEFAULT_ROUTES.get(site, DEFAULT_ROUTES["default"])
+            routes[site] = Route(**{**asdict(base), **overrides})
+        return cls(routes)
+
+    def route(self, site: str) -> Route:
+        return self.routes.get(site, self.routes["default"])
+
+    def model_for(self, site: str) -> str:
+        route = self.route(site)
+        with self._lock:
+            since = self.downgraded.get(site)
+            if since is not None and time.monotonic() - since >= self.UPGRADE_AFTER:
+                del self.downgraded[site]
+                self._site_stats(site).reset_window()
+                self.log(f"⏫ Route '{site}': cooldown over, back to {route.model}", "system")
+            downgraded = site in self.downgraded
+        if downgraded and route.fallback_model:
+            return route.fallback_model
+        return route.model
+
+    def observed_p95(self, site: str):
+        """(p95 seconds, sample count) for a site's recent calls"""
+        with self._lock:
+            stats = self.stats.get(site)
+            if not stats:
+                return None, 0
+            return stats.p95(), len(stats.latencies)
+
+    def _site_stats(self, site: str) -> SiteStats:
+        if site not in self.stats:
+            self.stats[site] = SiteStats()
+        return self.stats[site]
+
+    def record(self, site: str, model: str, seconds: float, usage=None, error: bool = False):
+        """Record one call and downgrade the site if its p95 breaches the SLO"""
+        with self._lock:
+            stats = self._site_stats(site)
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.latencies.append(seconds)
+            if error:
+                stats.errors += 1
+            if usage is not None:
+                prompt = getattr(usage, "prompt_tokens", 0) or 0
+                completion = getattr(usage, "completion_tokens", 0) or 0
+                stats.prompt_tokens += prompt
+                stats.completion_tokens += completion
+                price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+                stats.spend += (prompt * price_in + completion * price_out) / 1_000_000
+
+            route = self.route(site)
+            if site in self.downgraded or not route.slo_seconds or not route.fallback_model:
+                return
+            p95 = stats.p95()
+            stats.breaches = stats.breaches + 1 if p95 is not None and p95 > route.slo_seconds else 0
+            if stats.breaches >= self.BREACH_CALLS:
+                self.downgraded[site] = time.monotonic()
+                stats.reset_window()
+                self.log(f"⏬ Route '{site}': p95 {p95:.1f}s > SLO {route.slo_seconds:.1f}s for "
+                         f"{self.BREACH_CALLS} calls, switching {route.model} -> {route.fallback_model}", "system")
+
+    def report(self) -> Dict[str, Dict]:
+        """Per-site latency and spend summary"""
+        with self._lock:
+            out = {}
+            for site, stats in self.stats.items():
+                route = self.route(site)
+                out[site] = {
+                    "model": route.fallback_model if site in self.downgraded and route.fallback_model else route.model,
+                    "downgraded": site in self.downgraded,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "avg_seconds": stats.total_seconds / stats.calls if stats.calls else 0.0,
+                    "p95_seconds": stats.p95() or 0.0,
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "spend_usd": stats.spend,
+                }
+            return out
+
+    def format_report(self) -> str:
+        lines = [f"{'site':<8} {'model':<12} {'calls':>5} {'avg s':>6} {'p95 s':>6} {'tokens':>8} {'$':>8}"]
+        for site, r in sorted(self.report().items()):
+            flag = "*" if r["downgraded"] else ""
+            tokens = r["prompt_tokens"] + r["completion_tokens"]
+            lines.append(f"{site:<8} {r['model'] + flag:<12} {r['calls']:>5} {r['avg_seconds']:>6.2f} "
+                         f"{r['p95_seconds']:>6.2f} {tokens:>8} {r['spend_usd']:>8.4f}")
+        return "\n".join(lines)
@@ -1,7 +1,7 @@
 """Personality Engine: Tracks Student State & Selects Style"""
 
 from typing import Dict, List, Optional
-from prompts_improved import STYLE_PROFILES
+from .prompts_improved import STYLE_PROFILES
 
 class PersonalityDetector:
     """Tracks emotional state and communication style signals over time"""
@@ -12,6 +12,8 @@ class PersonalityDetector:
         self.frustration = 0.0
         self.curiosity = 0.5
         self.energy = 0.5
+        # How the student writes, carried over from earlier sessions (see student_profiles)
+        self.communication: Optional[str] = None
         
     def update(self, response: str):
         """Update state based on the latest student message"""
@@ -42,6 +44,17 @@ class PersonalityDetector:
             # Short, flat responses indicate low energy/boredom
             self.energy = max(0.0, self.energy - 0.1)
             
+    def snapshot(self) -> Dict[str, float]:
+        return {"confidence": self.confidence, "frustration": self.frustration,
+                "curiosity": self.curiosity, "energy": self.energy}
+
+    def restore(self, state: Dict[str, float]):
+        """Start from a previous session's state; frustration is halved for the fresh topic"""
+        self.confidence = state.get("confidence", self.confidence)
+        self.frustration = state.get("frustration", self.frustration) * 0.5
+        self.curiosity = state.get("curiosity", self.curiosity)
+        self.energy = state.get("energy", self.energy)
+
     def _has_emoji(self, text: str) -> bool:
         return any(char in text for char in "😊😂🥰👍🎉🔥💪🌟🥺😎")
 
@@ -53,11 +66,14 @@ class PersonalityDetector:
         elif self.confidence > 0.8: mood = "Confident"
         elif self.confidence < 0.3: mood = "Uncertain/Shy"
         
-        return {
+        state = {
             "mood": mood,
             "frustration": self.frustration,
             "energy": "High" if self.energy > 0.6 else "Low" if self.energy < 0.4 else "Neutral"
         }
+        if self.communication:
+            state["communication"] = self.communication
+        return state
 
     def determine_style(self, level: int) -> str:
         """Selects the best teaching persona based on current state"""
@@ -14,7 +14,13 @@ STYLE_PROFILES = {
         - BAD: "You got this! 🌟 What is the coefficient?" (Too abstract).
         - GOOD: "I know it looks like a mess, {name}. Let's ignore the letters for a second. Look at just the number 3."
         - MUST DO: Use emojis sparingly. Use their name. Break steps down to 1-2 words.
-        """
+        """,
+        # Degraded mode (LLM unavailable): {name}, {topic}, {echo} are filled in locally
+        "templates": [
+            "No worries, {name}. Let's take {topic} one small step at a time. 🙂 What's one word you remember about it?",
+            "You said \"{echo}\", {name}. Let's slow down: which part of that feels the most confusing?",
+            "Good effort, {name}! If you had to explain {topic} to a friend in one sentence, what would you say?",
+        ]
     },
     "socratic": {
         "name": "The Engaging Teacher 🍎",
@@ -25,7 +31,12 @@ STYLE_PROFILES = {
         - BAD: "Correct. Can you explain...?" (Robotic).
         - GOOD: "Exactly. But if that's true, {name}, what happens if we make the slope negative?"
         - MUST DO: Pivot quickly to the next interesting idea.
-        """
+        """,
+        "templates": [
+            "Interesting, {name}. Since you mentioned \"{echo}\", what do you think happens if we change one of the numbers?",
+            "So does that mean it always works that way in {topic}, {name}? Can you think of a case where it wouldn't?",
+            "Nice, {name}. How would you check that your answer actually makes sense?",
+        ]
     },
     "professor": {
         "name": "The Research Colleague 🔬",
@@ -36,7 +47,12 @@ STYLE_PROFILES = {
         - CRITICAL: NO EMOJIS. NO "Good job". NO "Technically accurate".
         - BAD: "You are spot on, Maya. Can you explain Landauer's limit?"
         - GOOD: "That's a fair point, {name}. But doesn't Landauer's limit assume a reversible process? In practice, noise might kill us first."
-        """
+        """,
+        "templates": [
+            "That's a fair point, {name}. But where does that reasoning break down at the edges of {topic}?",
+            "Taking \"{echo}\" seriously, {name}: what assumption is doing most of the work there?",
+            "Suppose we generalise that, {name}. Which other area does {topic} connect to, and how?",
+        ]
     }
 }
 
@@ -46,13 +62,15 @@ STYLE_PROFILES = {
 
 def get_adaptive_tutoring_prompt(level: int, topic: str, style_key: str, student_state: dict, student_name: str) -> str:
     style = STYLE_PROFILES.get(style_key, STYLE_PROFILES["socratic"])
+    # Known from this student's earlier sessions (student profile cache)
+    communication = f"\n- Writes: {student_state['communication']}" if student_state.get('communication') else ""
     
     return f"""You are an expert AI Tutor teaching {topic}.
 
 CURRENT STUDENT:
 - Name: {student_name}
 - Level: {level}/5.0
-- Mood: {student_state.get('mood', 'Neutral')}
+- Mood: {student_state.get('mood', 'Neutral')}{communication}
 - Persona: {style['name']}
 
 STRICT RULES:
@@ -103,17 +121,30 @@ Goal: Ask ONE question to confirm their level.
 Keep it natural. 2 sentences max."""
 
 def get_closing_prompt(level: int, first_msg: str, concepts: list, student_name: str) -> str:
+    concept = concepts[0] if concepts else "this topic"
     if level >= 5:
         return f"""Write a professional farewell for {student_name}.
-        - "It was a pleasure discussing {concepts[0]} with you."
+        - "It was a pleasure discussing {concept} with you."
         - Tone: Academic, respectful. NO EMOJIS.
         """
     else:
         return f"""Write a warm farewell for {student_name}.
-        - "You made great progress on {concepts[0]} today!"
+        - "You made great progress on {concept} today!"
         - Tone: Enthusiastic, emojis allowed.
         """
 
+# Degraded-mode templates for non-tutoring phases
+DEGRADED_ASSESSMENT = [
+    "Let's see where you are with {topic}, {name}. How would you describe it in your own words?",
+    "Thanks, {name}. Could you try a quick example from {topic} and talk me through each step?",
+    "Okay {name}, what's the hardest part of {topic} for you so far?",
+]
+
+DEGRADED_CLOSING = {
+    "academic": "It was a pleasure discussing {topic} with you, {name}. Which question would you pursue next?",
+    "warm": "You made real progress on {topic} today, {name}! 🎉 What's one thing you'll remember from this session?",
+}
+
 def get_self_eval_prompt(topic: str, level: int, student_name: str, student_last_msg: str) -> str:
     """Self-evaluation prompt for grading tutor responses"""
     if level >= 5:
@@ -151,4 +182,24 @@ OUTPUT FORMAT:
   "level": <float 1.0-5.0>,
   "confidence": <float 0.0-1.0>,
   "reasoning": "<specific evidence>"
-}"""
\ No newline at end of file
+}"""
+# ============================================================================
+# WARM-UP PROMPT (pre-run content bank, see warmup.py)
+# ============================================================================
+
+def get_warmup_prompt(topic: str, subject: str) -> str:
+    return f"""You are preparing a tutoring session on {topic} ({subject}).
+Write reusable openers and diagnostic questions. Do NOT use student names.
+
+RULES:
+- Openings: friendly first message, invites the student to say what they know. Ends with a question.
+- Diagnostics: ONE question each, 2 sentences max, pitched at that level:
+  Level 1 = recall a basic term, Level 3 = solve a standard problem independently,
+  Level 5 = "why"/"what if", edge cases, connections to other topics.
+- Level 5 diagnostics: NO EMOJIS.
+
+OUTPUT FORMAT (valid JSON only):
+{{
+  "openings": ["...", "...", "..."],
+  "diagnostics": {{"1": ["...", "..."], "2": ["...", "..."], "3": ["...", "..."], "4": ["...", "..."], "5": ["...", "..."]}}
+}}"""
@@ -0,0 +1,140 @@
+"""Student Profiles: Carrying What We Learned About a Student Across Topics
+
+Sessions for one student run back to back, so personality state, communication
+signals and the levels already predicted are reused for the next topic instead
+of being relearned during assessment.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .transcripts import STUDENT
+
+# Strength of a prior from earlier sessions in the same subject / another subject
+SAME_SUBJECT_STRENGTH = 0.75
+OTHER_SUBJECT_STRENGTH = 0.45
+# Two or more agreeing same-subject sessions (within one level) make the prior stronger
+CONSISTENT_BONUS = 0.15
+
+
+@dataclass
+class StudentProfile:
+    student_id: str
+    personality: Dict[str, float] = field(default_factory=dict)
+    levels_by_subject: Dict[str, List[int]] = field(default_factory=dict)
+    messages: int = 0
+    words: int = 0
+    emojis: int = 0
+    questions: int = 0
+    sessions: int = 0
+    turns_saved: int = 0
+    llm_calls_saved: int = 0
+
+    def prior(self, subject: str) -> Optional[Tuple[float, float]]:
+        """(level, strength) from this student's finished sessions, or None"""
+        same = self.levels_by_subject.get(subject, [])
+        if same:
+            strength = SAME_SUBJECT_STRENGTH
+            if len(same) >= 2 and max(same) - min(same) <= 1:
+                strength += CONSISTENT_BONUS
+            return sum(same) / len(same), strength
+        others = [lvl for levels in self.levels_by_subject.values() for lvl in levels]
+        if others:
+            return sum(others) / len(others), OTHER_SUBJECT_STRENGTH
+        return None
+
+    def communication(self) -> Optional[str]:
+        """Short description of how the student writes, for the tutoring prompt"""
+        if not self.messages:
+            return None
+        avg_words = self.words / self.messages
+        parts = ["short messages" if avg_words < 8 else "long messages" if avg_words > 25 else "medium-length messages"]
+        if self.emojis / self.messages >= 0.3:
+            parts.append("uses emojis")
+        if self.questions / self.messages >= 0.3:
+            parts.append("asks questions")
+        return ", ".join(parts)
+
+
+class ProfileCache:
+    """Per-run profiles keyed by student id.
+
+    `seed()` runs at session start (not at prefetch time) so it sees every
+    session of the student that has already finished.
+    """
+
+    def __init__(self, enabled: bool = True, strong_prior: float = 0.85, assess_turns: int = 3,
+                 min_assess_turns: int = 1):
+        self.enabled = enabled
+        self.strong_prior = strong_prior
+        self.assess_turns = assess_turns
+        self.min_assess_turns = min_assess_turns
+        self.profiles: Dict[str, StudentProfile] = {}
+        self._lock = threading.Lock()
+
+    def get(self, student_id: str) -> StudentProfile:
+        with self._lock:
+            if student_id not in self.profiles:
+                self.profiles[student_id] = StudentProfile(student_id)
+            return self.profiles[student_id]
+
+    def seed(self, student_id: str, subject: str, detector, tracker) -> int:
+        """Seed a new session from the profile; returns its number of assessment turns"""
+        if not self.enabled:
+            return self.assess_turns
+        profile = self.get(student_id)
+        if profile.personality:
+            tracker.restore(profile.personality)
+        tracker.communication = profile.communication()
+
+        prior = profile.prior(subject)
+        if prior is None:
+            return self.assess_turns
+        level, strength = prior
+        if strength < self.strong_prior:
+            detector.set_prior(level, strength)
+            return self.assess_turns
+        # Strong prior (agreeing same-subject sessions): stand in for the LLM on the skipped turns
+        detector.set_prior(level, strength, skip_llm_turns=self.assess_turns - self.min_assess_turns)
+        return self.min_assess_turns
+
+    def update(self, student_id: str, subject: str, final_level: int, detector, tracker) -> bool:
+        """Fold a finished session back into the student's profile.
+
+        Returns whether its final level became part of the level prior: sessions
+        where most estimates were rules-only (degraded mode) are left out, since
+        those levels are mostly the rule default rather than evidence.
+        """
+        if not self.enabled:
+            return False
+        profile = self.get(student_id)
+        profile.personality = tracker.snapshot()
+        use_level = len(detector.estimates_history) > 2 * detector.rules_only_turns
+        if use_level:
+            profile.levels_by_subject.setdefault(subject, []).append(final_level)
+        for msg in detector.conversation_history:
+            if msg.role is not STUDENT:
+                continue
+            profile.messages += 1
+            profile.words += len(msg.content.split())
+            profile.emojis += int(tracker._has_emoji(msg.content))
+            profile.questions += int("?" in msg.content)
+        profile.sessions += 1
+        # Counted here, not in seed(), so failed sessions don't inflate the report
+        profile.turns_saved += detector.skip_llm_turns
+        profile.llm_calls_saved += detector.llm_calls_saved
+        return use_level
+
+    def format_report(self) -> str:
+        if not self.enabled:
+            return "disabled (ablation)"
+        with self._lock:
+            profiles = list(self.profiles.values())
+        if not profiles:
+            return "no sessions"
+        lines = [f"{'student':<16} {'sessions':>8} {'turns saved':>11} {'llm calls saved':>15}"]
+        for p in profiles:
+            lines.append(f"{p.student_id:<16} {p.sessions:>8} {p.turns_saved:>11} {p.llm_calls_saved:>15}")
+        lines.append(f"{'total':<16} {sum(p.sessions for p in profiles):>8} "
+                     f"{sum(p.turns_saved for p in profiles):>11} {sum(p.llm_calls_saved for p in profiles):>15}")
+        return "\n".join(lines)
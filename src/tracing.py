@@ -0,0 +1,181 @@
+"""Tracing: Per-Turn Spans in Chrome Trace / Perfetto Format
+
+Disabled by default; `span()` then returns a shared no-op context manager, so
+instrumented code pays one flag check. Enable with `enable()` (or TRACE_FILE /
+`python -m src run --trace trace.json`) and open the file in ui.perfetto.dev.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from .model_routing import percentile
+
+# Attributes inherited by nested spans
+CONTEXT_KEYS = ("session", "turn", "phase")
+
+_enabled = False
+_events: List[Dict] = []
+_events_lock = threading.Lock()
+_local = threading.local()
+_pid = os.getpid()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "context")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        if hasattr(self, "context"):
+            self.context.update({k: v for k, v in attrs.items() if k in CONTEXT_KEYS})
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        parent = stack[-1].context if stack else {}
+        self.context = {**parent, **{k: v for k, v in self.attrs.items() if k in CONTEXT_KEYS}}
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _local.stack.pop()
+        args = {**self.context, **self.attrs}
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        event = {
+            "name": self.name, "ph": "X", "pid": _pid, "tid": threading.get_ident(),
+            "ts": self.start / 1000, "dur": (end - self.start) / 1000, "args": args,
+        }
+        with _events_lock:
+            _events.append(event)
+        return False
+
+
+def span(name: str, **attrs):
+    """Time a block: `with span("judge.verify", phase="tutor"): ...`"""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def traced(name: str):
+    """Decorator form of `span` for whole functions/methods"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def export(path: str):
+    """Write collected spans as Chrome trace JSON (and keep collecting)"""
+    with _events_lock:
+        events = list(_events)
+    names = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": t.ident, "args": {"name": t.name}}
+             for t in threading.enumerate()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": names + events, "displayTimeUnit": "ms"}, f)
+
+
+# ============ ANALYSIS ============
+
+def critical_path(events: List[Dict], root: str = "turn") -> Dict[str, List[float]]:
+    """Split each `root` span's wall time among its direct children (same thread).
+
+    Turns run serially, so the direct children are the critical path; time not
+    covered by any child is reported as "<root>.self".
+    """
+    by_thread = defaultdict(list)
+    for e in events:
+        if e.get("ph") == "X":
+            by_thread[e["tid"]].append(e)
+
+    contributions = defaultdict(list)
+    for spans in by_thread.values():
+        spans.sort(key=lambda e: (e["ts"], -e["dur"]))
+        for i, parent in enumerate(spans):
+            if parent["name"] != root:
+                continue
+            end = parent["ts"] + parent["dur"]
+            covered_until = parent["ts"]
+            per_child = defaultdict(float)
+            for child in spans[i + 1:]:
+                if child["ts"] >= end:
+                    break
+                if child["ts"] < covered_until:
+                    continue  # Nested deeper; already counted in its parent child
+                per_child[child["name"]] += child["dur"]
+                covered_until = child["ts"] + child["dur"]
+            per_child[f"{root}.self"] = max(0.0, parent["dur"] - sum(per_child.values()))
+            for name, dur in per_child.items():
+                contributions[name].append(dur / 1000)  # ms
+    return contributions
+
+
+def summarize(path: str, root: str = "turn", top: Optional[int] = None) -> str:
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    contributions = critical_path(events, root)
+    grand_total = sum(sum(v) for v in contributions.values()) or 1.0
+    turns = sum(1 for e in events if e.get("name") == root and e.get("ph") == "X")
+
+    rows = sorted(contributions.items(), key=lambda kv: -sum(kv[1]))[:top]
+    lines = [f"{turns} {root} spans, {grand_total / 1000:.1f}s total",
+             f"{'contributor':<28} {'share':>6} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8}"]
+    for name, values in rows:
+        total = sum(values)
+        lines.append(f"{name:<28} {total / grand_total:>6.1%} {total / 1000:>8.1f} "
+                     f"{percentile(values, 0.5):>8.0f} {percentile(values, 0.95):>8.0f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m src trace-summary",
+                                     description="Rank critical-path contributors in a trace file")
+    parser.add_argument("trace", help="Chrome trace JSON written by --trace")
+    parser.add_argument("--root", default="turn", help="Span whose wall time is broken down")
+    parser.add_argument("--top", type=int, default=None)
+    args = parser.parse_args(argv)
+    print(summarize(args.trace, args.root, args.top))
@@ -0,0 +1,246 @@
+"""Transcripts: Persisting Sessions for Offline Analysis"""
+
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+TUTOR = sys.intern("tutor")
+STUDENT = sys.intern("student")
+_FLUSH = object()  # Writer-queue sentinel
+
+
+class Message:
+    """Compact conversation message (slotted, interned role); still readable as msg['role']"""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = sys.intern(role)
+        self.content = content
+
+    def __getitem__(self, key: str) -> str:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+    def __repr__(self) -> str:
+        return f"Message({self.role!r}, {self.content[:30]!r})"
+
+
+def as_dicts(history: Iterable) -> List[Dict[str, str]]:
+    """JSON-ready copy of a history made of Messages or plain dicts"""
+    return [m.to_dict() if isinstance(m, Message) else dict(m) for m in history]
+
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    set_type TEXT,
+    started_at REAL,
+    mse REAL,
+    tutoring_score REAL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    set_type TEXT,
+    student_id TEXT NOT NULL,
+    student_name TEXT,
+    topic_id TEXT NOT NULL,
+    topic_name TEXT,
+    subject_name TEXT,
+    predicted_level INTEGER,
+    started_at REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    level REAL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_run ON sessions(run_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_student ON sessions(student_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_topic ON sessions(topic_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_level ON sessions(predicted_level);
+CREATE INDEX IF NOT EXISTS idx_messages_session_turn ON messages(session_id, turn);
+"""
+
+
+class TranscriptStore:
+    """Append-only SQLite transcript store.
+
+    Writes are queued and committed in batches by a background thread, so the turn
+    loop never waits on disk. Readers stream rows and run in constant memory.
+    """
+
+    def __init__(self, path: str, flush_every: int = 64, flush_seconds: float = 1.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.dropped = 0  # Rows lost to write errors (locked database, full disk, ...)
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    # ============ WRITES (batched, non-blocking) ============
+
+    def _put(self, sql: str, params: tuple):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="transcript-writer", daemon=True)
+                    self._writer.start()
+        self._queue.put((sql, params))
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path)
+        pending = []
+        oldest = 0.0
+        while True:
+            try:
+                sql, params = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                sql, params = None, None  # Idle: commit whatever is pending
+            if sql is not None and sql is not _FLUSH:
+                if not pending:
+                    oldest = time.monotonic()
+                pending.append((sql, params))
+                if len(pending) < self.flush_every and time.monotonic() - oldest < self.flush_seconds:
+                    continue
+            if pending:
+                try:
+                    with conn:
+                        for statement, values in pending:
+                            conn.execute(statement, values)
+                except sqlite3.Error as e:
+                    # Drop the batch but keep the writer alive, so flush() still returns
+                    self.dropped += len(pending)
+                    print(f"⚠️ Transcript write failed, {len(pending)} rows dropped: {e}", file=sys.stderr)
+                pending.clear()
+            if sql is _FLUSH:
+                done, close = params
+                done.set()
+                if close:
+                    conn.close()
+                    return
+
+    def flush(self, close: bool = False):
+        """Block until everything queued so far is committed"""
+        if self._writer is None:
+            return
+        writer = self._writer
+        done = threading.Event()
+        self._queue.put((_FLUSH, (done, close)))
+        while not done.wait(0.5):
+            if not writer.is_alive():
+                print("⚠️ Transcript writer stopped; queued rows were not saved", file=sys.stderr)
+                break
+        if close:
+            self._writer = None
+
+    def close(self):
+        self.flush(close=True)
+
+    def start_run(self, run_id: str, set_type: str):
+        self._put("INSERT OR IGNORE INTO runs (run_id, set_type, started_at) VALUES (?, ?, ?)",
+                  (run_id, set_type, time.time()))
+
+    def finish_run(self, run_id: str, mse: Optional[float], tutoring_score: Optional[float]):
+        self._put("UPDATE runs SET mse = ?, tutoring_score = ? WHERE run_id = ?", (mse, tutoring_score, run_id))
+
+    def start_session(self, run_id: str, set_type: str, student_id: str, student_name: str,
+                      topic_id: str, topic_name: str, subject_name: str) -> str:
+        session_id = f"{run_id}:{student_id}:{topic_id}"
+        self._put("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                  (session_id, run_id, set_type, student_id, student_name, topic_id, topic_name,
+                   subject_name, time.time()))
+        return session_id
+
+    def append_exchange(self, session_id: str, turn: int, tutor_msg: str, student_msg: str,
+                        level: Optional[float] = None, confidence: Optional[float] = None):
+        sql = "INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)"
+        self._put(sql, (session_id, turn, TUTOR, tutor_msg, None, None))
+        self._put(sql, (session_id, turn, STUDENT, student_msg, level, confidence))
+
+    def finish_session(self, session_id: str, predicted_level: int):
+        self._put("UPDATE sessions SET predicted_level = ? WHERE session_id = ?", (predicted_level, session_id))
+
+    # ============ READS (streaming) ============
+
+    def _where(self, **filters) -> tuple:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"s.{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_messages(self, run_id: str = None, student_id: str = None, topic_id: str = None,
+                      predicted_level: int = None, batch_size: int = 1000) -> Iterator[tuple]:
+        """Stream (session_id, turn, role, content, level, confidence) rows"""
+        where, params = self._where(run_id=run_id, student_id=student_id, topic_id=topic_id,
+                                    predicted_level=predicted_level)
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT m.session_id, m.turn, m.role, m.content, m.level, m.confidence "
+                f"FROM messages m JOIN sessions s USING (session_id){where} "
+                "ORDER BY m.session_id, m.turn, m.rowid", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_sessions(self, run_id: str = None, student_id: str = None, topic_id: str = None,
+                      predicted_level: int = None) -> Iterator[Dict]:
+        """Stream session records (session row + history + estimates) one session at a time"""
+        where, params = self._where(run_id=run_id, student_id=student_id, topic_id=topic_id,
+                                    predicted_level=predicted_level)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            sessions = conn.execute(f"SELECT * FROM sessions s{where} ORDER BY s.session_id", params)
+            for row in sessions:
+                history, estimates = [], []
+                for role, content, level, conf in conn.execute(
+                        "SELECT role, content, level, confidence FROM messages "
+                        "WHERE session_id = ? ORDER BY turn, rowid", (row["session_id"],)):
+                    history.append({"role": role, "content": content})
+                    if role == STUDENT and level is not None:
+                        estimates.append({"level": level, "confidence": conf})
+                record = dict(row)
+                record.update(type="session", history=history, estimates=estimates)
+                yield record
+            runs = "SELECT * FROM runs" + (" WHERE run_id = ?" if run_id else "")
+            for row in conn.execute(runs, (run_id,) if run_id else ()):
+                yield dict(row, type="run")
+        finally:
+            conn.close()
+
+
+def iter_transcripts(paths: Iterable[str]) -> Iterator[Dict]:
+    """Stream session and run records from one or more SQLite transcript stores"""
+    for path in paths:
+        yield from TranscriptStore(path).iter_sessions()
@@ -0,0 +1,119 @@
+"""Warm-Up: Per-Topic Opening & Diagnostic Bank, Built Before the Run
+
+Sessions that share a topic reuse the same openers and level-pitched
+diagnostic questions, so early turns need no LLM call. The bank is a JSON
+file keyed by subject and topic name ("Math::Fractions") and survives across runs.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .prompts_improved import get_warmup_prompt
+from .tracing import span
+
+
+class ContentBank:
+    """Thread-safe (subject, topic) -> {"openings": [...], "diagnostics": {"1": [...], ...}} cache"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.topics: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                # Entries keyed by topic name alone (older banks) are dropped and regenerated
+                self.topics = {key: entry for key, entry in json.load(f).items() if "::" in key}
+
+    @staticmethod
+    def key(subject: str, topic: str) -> str:
+        """Same-named topics in different subjects get separate entries"""
+        return f"{subject}::{topic}"
+
+    def has(self, subject: str, topic: str) -> bool:
+        return self.key(subject, topic) in self.topics
+
+    def put(self, subject: str, topic: str, content: Dict):
+        with self._lock:
+            self.topics[self.key(subject, topic)] = content
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.topics, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+
+    def opening(self, subject: str, topic: str) -> Optional[str]:
+        openings = self.topics.get(self.key(subject, topic), {}).get("openings") or []
+        return random.choice(openings) if openings else None
+
+    def diagnostic(self, subject: str, topic: str, level: int, exclude: List[str]) -> Optional[str]:
+        """An unused diagnostic for the level, falling back to neighbouring levels"""
+        diagnostics = self.topics.get(self.key(subject, topic), {}).get("diagnostics") or {}
+        for candidate_level in (level, level - 1, level + 1):
+            unused = [q for q in diagnostics.get(str(candidate_level), []) if q not in exclude]
+            if unused:
+                return unused[0]
+        return None
+
+
+def _parse(response: str) -> Optional[Dict]:
+    match = re.search(r"\{.*\}", response or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        content = json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+    openings = [q.strip() for q in content.get("openings", []) if isinstance(q, str) and q.strip()]
+    diagnostics = {str(level): [q.strip() for q in qs if isinstance(q, str) and q.strip()]
+                   for level, qs in (content.get("diagnostics") or {}).items()}
+    if not openings and not any(diagnostics.values()):
+        return None
+    return {"openings": openings, "diagnostics": diagnostics}
+
+
+def collect_topics(api, students: List[Dict], workers: int = 8) -> Dict[str, List[Dict]]:
+    """student_id -> topics for every student (reused by the run loop)"""
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog") as pool:
+        topics = list(pool.map(lambda s: api.get_student_topics(s["id"]), students))
+    return {s["id"]: t for s, t in zip(students, topics)}
+
+
+def warm_up(llm, bank: ContentBank, topics: List[Dict], workers: int = 8, log=print) -> int:
+    """Generate bank entries for topics not cached yet, in parallel. Returns topics generated."""
+    missing = set()
+    for t in topics:
+        subject = t.get("subject_name", "")
+        if not bank.has(subject, t["name"]):
+            missing.add((subject, t["name"]))
+    if not missing:
+        return 0
+
+    def generate(subject: str, topic: str) -> bool:
+        with span("warmup.topic", topic=topic):
+            try:
+                response = llm.chat(get_warmup_prompt(topic, subject), f"Topic: {topic}",
+                                    temperature=0.8, site="warmup")
+            except Exception as e:
+                log(f"⚠️ Warm-up failed for {topic}: {e}")
+                return False
+        content = _parse(response)
+        if content:
+            bank.put(subject, topic, content)
+        return content is not None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as pool:
+        results = list(pool.map(lambda item: generate(*item), sorted(missing)))
+    bank.save()
+    log(f"🔥 Warm-up: {sum(results)}/{len(missing)} topics in {time.perf_counter() - start:.1f}s")
+    return sum(results)
@@ -0,0 +1,47 @@
+from src.batch_grader import ResultsDB, iter_turn_jobs, parse_score
+
+
+def session(**overrides):
+    record = {
+        "type": "session", "run_id": "r1", "student_id": "s1", "topic_id": "t1",
+        "topic_name": "Fractions", "student_name": "Mia Test", "predicted_level": 4,
+        "history": [
+            {"role": "tutor", "content": "opening"},
+            {"role": "student", "content": "answer 1"},
+            {"role": "tutor", "content": "reply 2"},
+            {"role": "student", "content": "answer 2"},
+            {"role": "tutor", "content": "reply 3"},
+            {"role": "student", "content": "answer 3"},
+        ],
+        "estimates": [{"level": 1.2}, {"level": 2.6}, {"level": 4.9}],
+    }
+    record.update(overrides)
+    return record
+
+
+def test_jobs_pair_each_reply_with_the_estimate_it_was_written_for():
+    jobs = list(iter_turn_jobs([session()], ResultsDB(":memory:")))
+    assert [(j["turn"], j["response"], j["last_student_msg"], j["level"]) for j in jobs] == [
+        (2, "reply 2", "answer 1", 1),
+        (3, "reply 3", "answer 2", 3),
+    ]
+    assert jobs[0]["student_name"] == "Mia"
+
+
+def test_missing_estimates_fall_back_to_prediction():
+    jobs = list(iter_turn_jobs([session(estimates=[])], ResultsDB(":memory:")))
+    assert [j["level"] for j in jobs] == [4, 4]
+
+
+def test_graded_turns_are_skipped_and_runs_recorded():
+    db = ResultsDB(":memory:")
+    db.write_turns([("r1", "s1", "t1", 2, 1, 8.0, "Score: 8")])
+    run = {"type": "run", "run_id": "r1", "set_type": "mini_dev", "mse": 0.5, "tutoring_score": 4.0}
+    jobs = list(iter_turn_jobs([run, session()], db))
+    assert [j["turn"] for j in jobs] == [3]
+    assert db.conn.execute("SELECT tutoring_score FROM runs").fetchone() == (4.0,)
+
+
+def test_parse_score():
+    assert parse_score("Score: 7 | Issues: None") == 7.0
+    assert parse_score("SCORE: N/A | Error") is None
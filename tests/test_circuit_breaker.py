@@ -0,0 +1,71 @@
+import time
+
+from src.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+TIMEOUT = 2.0  # Route timeout: calls over 1s are slow
+
+
+def make(**kwargs):
+    changes = []
+    breaker = CircuitBreaker(error_rate=0.5, slow_fraction=0.5, window=10, min_calls=4,
+                             cooldown=0.05, on_change=lambda old, new: changes.append((old, new)), **kwargs)
+    return breaker, changes
+
+
+def test_stays_closed_below_min_calls():
+    breaker, _ = make()
+    for _ in range(3):
+        breaker.record(0.1, TIMEOUT, error=True)
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_trips_on_error_rate_and_rejects():
+    breaker, changes = make()
+    for error in (True, False, True, False):
+        breaker.record(0.1, TIMEOUT, error=error)
+    assert breaker.state == OPEN
+    assert breaker.is_degraded()
+    assert not breaker.allow()
+    assert breaker.report()["rejected"] == 1
+    assert changes == [(CLOSED, OPEN)]
+
+
+def test_slow_calls_count_as_failures():
+    breaker, _ = make()
+    for _ in range(4):
+        breaker.record(1.5, TIMEOUT)
+    assert breaker.state == OPEN
+
+
+def test_slow_is_relative_to_the_route_timeout():
+    breaker, _ = make()
+    for _ in range(10):
+        breaker.record(25.0, 60.0)  # e.g. warm-up: long, but well inside its own timeout
+    assert breaker.state == CLOSED
+    for _ in range(10):
+        breaker.record(15.0, 20.0)  # e.g. judge: most of its timeout gone
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    breaker, changes = make()
+    for _ in range(4):
+        breaker.record(0.1, TIMEOUT, error=True)
+    time.sleep(0.06)
+    assert breaker.allow()          # The probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()      # Only one probe at a time
+    breaker.record(0.1, TIMEOUT)
+    assert breaker.state == CLOSED and not breaker.is_degraded()
+    assert changes == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+
+
+def test_failed_probe_reopens():
+    breaker, _ = make()
+    for _ in range(4):
+        breaker.record(0.1, TIMEOUT, error=True)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(0.1, TIMEOUT, error=True)
+    assert breaker.state == OPEN
+    assert breaker.report()["trips"] == 2
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from src.deadlines import DeadlineExceeded, DeadlineScope, HedgePolicy
+
+
+def test_budget_without_deadline_is_the_timeout():
+    assert DeadlineScope().budget(30.0) == 30.0
+
+
+def test_budget_is_capped_by_remaining_time():
+    scope = DeadlineScope()
+    with scope(1.0):
+        assert scope.budget(30.0) <= 1.0
+        assert scope.budget(0.5) == 0.5
+
+
+def test_nested_scope_only_tightens():
+    scope = DeadlineScope()
+    with scope(1.0):
+        with scope(60.0):
+            assert scope.remaining() <= 1.0
+        with scope(0.2):
+            assert scope.remaining() <= 0.2
+        assert 0.2 < scope.remaining() <= 1.0
+    assert scope.remaining() is None
+
+
+def test_expired_deadline_raises():
+    scope = DeadlineScope()
+    with scope(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            scope.budget(30.0)
+
+
+def test_hedge_delay_needs_enabled_policy_and_observed_p95():
+    assert HedgePolicy(enabled=False).hedge_delay(2.0) is None
+    assert HedgePolicy(enabled=True).hedge_delay(None) is None  # Site below SiteStats.MIN_SAMPLES
+    assert HedgePolicy(enabled=True).hedge_delay(2.0) == 2.0
+
+
+def test_try_acquire_respects_max_rate():
+    policy = HedgePolicy(enabled=True, max_rate=0.1)
+    assert not policy.try_acquire()  # 1 hedge > 10% of 0 calls
+    for _ in range(10):
+        policy.record_call(1.0)
+    assert policy.try_acquire()
+    assert not policy.try_acquire()
+    assert policy.report()["hedges"] == 1
+
+
+def test_report_percentiles_are_not_the_window_max():
+    policy = HedgePolicy(enabled=True)
+    for seconds in [1.0] * 19 + [30.0]:
+        policy.record_call(seconds)
+    assert policy.report()["p95_with_hedging"] < 30.0
+    assert HedgePolicy().report()["p99_without_hedging"] == 0.0
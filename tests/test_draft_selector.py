@@ -0,0 +1,36 @@
+from src.draft_selector import DraftSelector
+
+
+def test_good_draft_reaches_accept_score():
+    score, issues = DraftSelector().score("Nice work, Mia. What happens if x doubles?", 3, "Mia", [])
+    assert score >= DraftSelector.ACCEPT_SCORE
+    assert issues == []
+
+
+def test_missing_question_and_name_are_reported():
+    score, issues = DraftSelector().score("That is the chain rule.", 3, "Mia", [])
+    assert "no question" in issues and "no name" in issues
+    assert score < DraftSelector.ACCEPT_SCORE
+
+
+def test_emoji_at_level_five_is_penalised():
+    plain, _ = DraftSelector().score("Mia, why does entropy increase?", 5, "Mia", [])
+    emoji, issues = DraftSelector().score("Mia, why does entropy increase? 🔥", 5, "Mia", [])
+    assert "emoji at L5" in issues
+    assert emoji < plain
+
+
+def test_repeat_of_recent_turn_is_penalised():
+    draft = "Mia, what do you think the slope means here?"
+    fresh, _ = DraftSelector().score(draft, 3, "Mia", [])
+    repeat, issues = DraftSelector().score(draft, 3, "Mia", [draft])
+    assert "repeats earlier turn" in issues
+    assert repeat < fresh
+
+
+def test_select_picks_best_and_skips_empty():
+    best, score, _ = DraftSelector().select(
+        ["", "  ", "That is the chain rule.", "Mia, what is the chain rule for?"], 3, "Mia", [])
+    assert best == "Mia, what is the chain rule for?"
+    assert score >= DraftSelector.ACCEPT_SCORE
+    assert DraftSelector().select(["", None], 3, "Mia", [])[0] is None
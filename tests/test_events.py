@@ -0,0 +1,64 @@
+import io
+import threading
+import time
+
+from src.events import ConsoleSink, EventBatcher
+
+
+def log(n):
+    return {"type": "log", "message": f"line {n}"}
+
+
+def state(n):
+    return {"type": "state_update", "history": [], "current_level": n}
+
+
+def test_coalesce_keeps_only_the_newest_state_update_in_place():
+    events = [state(1), log(1), state(2), log(2), {"type": "breaker", "state": "open"}]
+    assert EventBatcher._coalesce(events) == [log(1), state(2), log(2), {"type": "breaker", "state": "open"}]
+    assert EventBatcher._coalesce([log(1), log(2)]) == [log(1), log(2)]
+
+
+def test_frames_are_bounded_by_size():
+    frames = []
+    batcher = EventBatcher(frames.append, interval=60, max_events=2)
+    for n in range(5):
+        batcher.emit(log(n))
+    batcher.close()
+    assert [len(f["events"]) for f in frames] == [2, 2, 1]
+    assert [e["message"] for f in frames for e in f["events"]] == [f"line {n}" for n in range(5)]
+
+
+def test_frames_are_bounded_by_time():
+    sent = threading.Event()
+    frames = []
+    batcher = EventBatcher(lambda frame: (frames.append(frame), sent.set()), interval=0.05, max_events=200)
+    start = time.monotonic()
+    batcher.emit(log(1))
+    assert sent.wait(2.0)
+    assert time.monotonic() - start < 1.0
+    assert frames == [{"type": "frame", "events": [log(1)]}]
+    batcher.close()
+
+
+def test_console_sink_flush_and_close():
+    stream = io.StringIO()
+    sink = ConsoleSink(stream)
+    sink.write("a")
+    sink.write("b")
+    sink.flush()
+    assert stream.getvalue() == "a\nb\n"
+    sink.write("c")
+    sink.close()
+    assert stream.getvalue() == "a\nb\nc\n"
+    assert not sink._thread.is_alive()
+
+
+def test_console_sink_survives_a_closed_stream():
+    stream = io.StringIO()
+    sink = ConsoleSink(stream)
+    stream.close()
+    sink.write("lost")
+    sink.flush()  # Returns instead of hanging
+    assert sink._thread.is_alive()
+    sink.close()
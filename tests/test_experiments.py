@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from src import prompts_improved
+from src.experiments import apply_overrides, cell_key, main, resolve_spec
+from src.level_inference_improved import LLMFirstDetector, RuleValidator
+
+PAIRS = [({"id": "s1"}, {"id": "t1"}), ({"id": "s1"}, {"id": "t2"})]
+
+
+@pytest.fixture
+def restore(monkeypatch):
+    """Undo apply_overrides' module/class patches after the test"""
+    def keep(target, *attrs):
+        for attr in attrs:
+            monkeypatch.setattr(target, attr, getattr(target, attr))
+    return keep
+
+
+def test_cell_key_covers_spec_set_sample_and_scoring():
+    spec = {"detector": {"FINAL_CUTOFFS": [1.5, 2.5, 3.5, 4.5]}}
+    key = cell_key(spec, "mini_dev", PAIRS, False)
+    assert key == cell_key(json.loads(json.dumps(spec)), "mini_dev", list(PAIRS), False)
+    assert key != cell_key({}, "mini_dev", PAIRS, False)
+    assert key != cell_key(spec, "dev", PAIRS, False)
+    assert key != cell_key(spec, "mini_dev", PAIRS[:1], False)
+    assert key != cell_key(spec, "mini_dev", PAIRS, True)
+
+
+def test_apply_overrides_patches_classes_and_modules(restore):
+    restore(LLMFirstDetector, "FINAL_CUTOFFS")
+    restore(RuleValidator, "EXTREME_MASTERY")
+    restore(prompts_improved, "LEVEL_ANALYSIS_PROMPT")
+    apply_overrides({
+        "detector": {"FINAL_CUTOFFS": [1.5, 2.5, 3.5, 4.5]},
+        "rules": {"EXTREME_MASTERY": ["eigen"]},
+        "prompts": {"LEVEL_ANALYSIS_PROMPT": "v2"},
+    })
+    assert LLMFirstDetector.FINAL_CUTOFFS == (1.5, 2.5, 3.5, 4.5)  # Lists become tuples where the default is one
+    assert RuleValidator.EXTREME_MASTERY == ["eigen"]
+    assert prompts_improved.LEVEL_ANALYSIS_PROMPT == "v2"
+
+
+def test_apply_overrides_merges_dict_attributes(restore):
+    restore(prompts_improved, "STYLE_PROFILES")
+    name, profile = next(iter(prompts_improved.STYLE_PROFILES.items()))
+    key = next(k for k, v in profile.items() if not isinstance(v, dict))
+    apply_overrides({"prompts": {"STYLE_PROFILES": {name: {key: "changed"}}}})
+    merged = prompts_improved.STYLE_PROFILES
+    assert merged[name][key] == "changed"
+    assert {k: v for k, v in merged[name].items() if k != key} == {k: v for k, v in profile.items() if k != key}
+    assert len(merged) > 1
+
+
+def test_resolve_spec_rejects_unknown_keys_and_inlines_files(tmp_path):
+    (tmp_path / "level.txt").write_text("prompt from file")
+    spec = resolve_spec({"prompts": {"LEVEL_ANALYSIS_PROMPT": "@level.txt"}}, str(tmp_path))
+    assert spec == {"prompts": {"LEVEL_ANALYSIS_PROMPT": "prompt from file"}}
+    with pytest.raises(ValueError):
+        resolve_spec({"prompt": {}}, str(tmp_path))
+    with pytest.raises(ValueError):
+        resolve_spec({"detector": {"NO_SUCH_ATTR": 1}}, str(tmp_path))
+
+
+@pytest.mark.parametrize("set_type, argv", [("eval", []), ("eval", ["--allow-dev"]), ("dev", [])])
+def test_submission_budgets_are_protected(tmp_path, set_type, argv):
+    matrix = tmp_path / "matrix.json"
+    matrix.write_text(json.dumps({"set": set_type, "variants": {"baseline": {}}}))
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(matrix), "--workdir", str(tmp_path)] + argv)
+    assert exit_info.value.code == 2
@@ -0,0 +1,103 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+from src import config
+from src.deadlines import DeadlineExceeded, HedgePolicy
+from src.llm_client_improved import LLMClientV3
+from src.model_routing import ModelRouter
+
+
+class Flaky(openai.APIConnectionError):
+    """Retryable error without the SDK's request plumbing"""
+
+    def __init__(self):
+        Exception.__init__(self, "connection reset")
+
+
+def reply(text, delay=0.0):
+    def behaviour(timeout):
+        time.sleep(delay)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+    return behaviour
+
+
+def fail(timeout):
+    raise Flaky()
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions; the i-th request runs behaviours[i] (the last one repeats)"""
+
+    def __init__(self, *behaviours):
+        self.behaviours = behaviours
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, timeout, **kwargs):
+        with self._lock:
+            behaviour = self.behaviours[min(self.calls, len(self.behaviours) - 1)]
+            self.calls += 1
+        return behaviour(timeout)
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "sk-test")
+
+    def make(*behaviours, hedging=False):
+        client = LLMClientV3(router=ModelRouter(), hedge=HedgePolicy(enabled=hedging, max_rate=1.0))
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(*behaviours)))
+        client.log = lambda *args, **kwargs: None
+        client.RETRY_BACKOFF = 0.01
+        return client, client.client.chat.completions
+    return make
+
+
+def test_hedge_wins_and_in_flight_loser_is_counted_abandoned(make_client):
+    client, completions = make_client(reply("slow", delay=0.5), reply("fast"), hedging=True)
+    start = time.perf_counter()
+    assert client._hedged("tutor", 2.0, 0.05, {}) == ["fast"]
+    assert time.perf_counter() - start < 0.4  # Didn't wait for the primary
+    report = client.hedge.report()
+    assert (report["hedges"], report["hedge_wins"], report["abandoned"]) == (1, 1, 1)
+    assert completions.calls == 2
+
+
+def test_fast_primary_is_not_hedged(make_client):
+    client, completions = make_client(reply("primary"), hedging=True)
+    assert client._hedged("tutor", 2.0, 0.5, {}) == ["primary"]
+    report = client.hedge.report()
+    assert (report["hedges"], report["abandoned"]) == (0, 0)
+    assert completions.calls == 1
+
+
+def test_retryable_errors_are_retried(make_client):
+    client, completions = make_client(fail, fail, reply("ok"))
+    assert client.chat("system", "user", site="tutor") == "ok"
+    assert completions.calls == 3
+
+
+def test_retries_stop_at_the_deadline(make_client):
+    client, completions = make_client(fail)
+    client.RETRY_BACKOFF = 0.3
+    start = time.perf_counter()
+    with client.deadline(0.5):
+        with pytest.raises(Flaky):
+            client.chat("system", "user", site="tutor")
+    # Second backoff (0.6s) doesn't fit in what is left of the 0.5s deadline
+    assert completions.calls == 2
+    assert time.perf_counter() - start < 0.5
+
+
+def test_spent_deadline_skips_the_call(make_client):
+    client, completions = make_client(reply("never"))
+    with client.deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            client.chat("system", "user", site="tutor")
+    assert completions.calls == 0
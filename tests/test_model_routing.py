@@ -0,0 +1,65 @@
+import pytest
+
+from src.model_routing import ModelRouter, SiteStats, percentile
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+    assert percentile([0, 10], 0.95) == 9.5
+
+
+def test_p95_needs_enough_samples():
+    stats = SiteStats()
+    for _ in range(SiteStats.MIN_SAMPLES - 1):
+        stats.latencies.append(1.0)
+    assert stats.p95() is None
+    stats.latencies.append(1.0)
+    assert stats.p95() == 1.0
+
+
+def test_single_outlier_is_not_the_p95():
+    stats = SiteStats()
+    stats.latencies.extend([2.0] * 19 + [13.0])
+    assert stats.p95() < 3.0
+
+
+def test_one_slow_call_does_not_downgrade():
+    router = ModelRouter()
+    for _ in range(19):
+        router.record("tutor", "gpt-5.2", 2.0)
+    router.record("tutor", "gpt-5.2", 13.0)
+    for _ in range(30):
+        router.record("tutor", "gpt-5.2", 2.0)
+    assert router.model_for("tutor") == "gpt-5.2"
+
+
+def test_sustained_breach_downgrades_then_recovers():
+    router = ModelRouter()
+    router.log = lambda *a, **k: None
+    for _ in range(SiteStats.MIN_SAMPLES + ModelRouter.BREACH_CALLS):
+        router.record("tutor", "gpt-5.2", 20.0)
+    assert router.model_for("tutor") == "gpt-5-mini"
+    assert router.report()["tutor"]["downgraded"]
+
+    router.UPGRADE_AFTER = 0.0
+    assert router.model_for("tutor") == "gpt-5.2"
+    assert router.observed_p95("tutor") == (None, 0)
+
+
+def test_sites_without_slo_never_downgrade():
+    router = ModelRouter()
+    for _ in range(100):
+        router.record("warmup", "gpt-5.2", 500.0)
+    assert router.model_for("warmup") == "gpt-5.2"
+
+
+def test_from_dict_overrides_known_sites():
+    router = ModelRouter.from_dict({"judge": {"model": "gpt-5-mini"}, "default": {"timeout": 10.0}})
+    assert router.route("judge").model == "gpt-5-mini"
+    assert router.route("judge").slo_seconds == 6.0
+    assert router.route("unlisted").timeout == 10.0
+
+
+def test_from_dict_rejects_unknown_sites():
+    with pytest.raises(ValueError, match="jugde"):
+        ModelRouter.from_dict({"jugde": {"model": "gpt-5-mini"}})
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("requests")
+
+from src.agent_improved import SessionPrefetcher
+
+
+class Recorder:
+    """prepare() stand-in that records calls and can block until released"""
+
+    def __init__(self, blocking=False):
+        self.started = []
+        self.gate = threading.Event()
+        if not blocking:
+            self.gate.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, student, topic):
+        with self._lock:
+            self.started.append((student, topic))
+        self.gate.wait(5)
+        if topic == "boom":
+            raise RuntimeError("start failed")
+        return f"{student}:{topic}"
+
+
+PAIRS = [("s1", "t1"), ("s1", "t2"), ("s2", "t1"), ("s2", "t2"), ("s3", "t1")]
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 4])
+def test_sessions_come_back_in_order(depth):
+    prefetcher = SessionPrefetcher(Recorder(), PAIRS, depth, lambda: False)
+    try:
+        results = [(pair, future.result()) for pair, future in prefetcher]
+    finally:
+        prefetcher.close()
+    assert results == [(pair, f"{pair[0]}:{pair[1]}") for pair in PAIRS]
+
+
+def test_inline_mode_prepares_lazily():
+    prepare = Recorder()
+    items = iter(SessionPrefetcher(prepare, PAIRS, 0, lambda: False))
+    next(items)
+    assert prepare.started == PAIRS[:1]
+
+
+def test_depth_bounds_sessions_prepared_ahead():
+    prepare = Recorder(blocking=True)
+    prefetcher = SessionPrefetcher(prepare, PAIRS, 2, lambda: False)
+    items = iter(prefetcher)
+    pair, _ = next(items)
+    assert pair == PAIRS[0]
+    assert [p for p, _ in prefetcher.pending] == PAIRS[1:3]  # Current session + 2 ahead
+    prepare.gate.set()
+    prefetcher.close()
+
+
+def test_close_after_stop_cancels_queued_sessions():
+    prepare = Recorder(blocking=True)
+    stop = threading.Event()
+    prefetcher = SessionPrefetcher(prepare, PAIRS, 2, stop.is_set)
+    items = iter(prefetcher)
+    next(items)
+    stop.set()
+    assert list(items) == []
+    prefetcher.close()
+    prepare.gate.set()
+    prefetcher.pool.shutdown(wait=True)
+    # Both workers were held by sessions 1-2, so session 3 was still queued and never ran
+    assert prepare.started[0] == PAIRS[0]
+    assert PAIRS[2] not in prepare.started and len(prepare.started) <= 2
+
+
+def test_prepare_errors_surface_through_the_future():
+    for depth in (0, 2):
+        prefetcher = SessionPrefetcher(Recorder(), [("s1", "boom"), ("s1", "t2")], depth, lambda: False)
+        futures = [future for _, future in prefetcher]
+        with pytest.raises(RuntimeError):
+            futures[0].result()
+        assert futures[1].result() == "s1:t2"
+        prefetcher.close()
@@ -0,0 +1,94 @@
+import pytest
+
+from src.level_inference_improved import LLMFirstDetector
+from src.personality import PersonalityDetector
+from src.student_profiles import (CONSISTENT_BONUS, OTHER_SUBJECT_STRENGTH, SAME_SUBJECT_STRENGTH, ProfileCache,
+                                  StudentProfile)
+
+
+class FakeLLM:
+    def __init__(self, level=4.0, fail=False):
+        self.level = level
+        self.fail = fail
+        self.calls = 0
+
+    def analyze_level(self, history, topic, turn_number):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("backend down")
+        return {"level": self.level, "confidence": 0.8}
+
+
+def run_session(cache, llm, student="s1", subject="Math", turns=3):
+    detector, tracker = LLMFirstDetector(llm), PersonalityDetector()
+    assess_turns = cache.seed(student, subject, detector, tracker)
+    for turn in range(1, turns + 1):
+        detector.add_exchange("tutor question?", "I think it is because of the slope")
+        detector.get_estimate(turn)
+    final = detector.get_final_prediction()
+    cache.update(student, subject, final, detector, tracker)
+    return assess_turns, detector
+
+
+def test_prior_strength_by_history():
+    profile = StudentProfile("s1")
+    assert profile.prior("Math") is None
+    profile.levels_by_subject["Math"] = [4]
+    assert profile.prior("Math") == (4, SAME_SUBJECT_STRENGTH)
+    assert profile.prior("Physics") == (4, OTHER_SUBJECT_STRENGTH)
+    profile.levels_by_subject["Math"].append(3)
+    assert profile.prior("Math") == (3.5, pytest.approx(SAME_SUBJECT_STRENGTH + CONSISTENT_BONUS))
+    profile.levels_by_subject["Math"].append(1)
+    assert profile.prior("Math")[1] == SAME_SUBJECT_STRENGTH  # No longer within one level
+
+
+def test_one_session_only_anchors_the_estimate():
+    cache = ProfileCache(strong_prior=0.85, assess_turns=3, min_assess_turns=1)
+    run_session(cache, FakeLLM(4.0))
+    assess_turns, detector = run_session(cache, FakeLLM(4.0))
+    assert assess_turns == 3
+    assert detector.prior == {"level": 4, "confidence": SAME_SUBJECT_STRENGTH}
+    assert detector.skip_llm_turns == 0
+
+
+def test_two_agreeing_sessions_shorten_assessment():
+    cache = ProfileCache(strong_prior=0.85, assess_turns=3, min_assess_turns=1)
+    run_session(cache, FakeLLM(4.0))
+    run_session(cache, FakeLLM(4.0))
+    llm = FakeLLM(4.0)
+    assess_turns, detector = run_session(cache, llm)
+    assert assess_turns == 1
+    assert detector.skip_llm_turns == 2
+    assert llm.calls == 1  # Turns 1-2 came from the prior
+    profile = cache.get("s1")
+    assert (profile.sessions, profile.turns_saved, profile.llm_calls_saved) == (3, 2, 2)
+
+
+def test_other_subject_prior_never_shortens_assessment():
+    cache = ProfileCache(strong_prior=0.85)
+    run_session(cache, FakeLLM(4.0), subject="Math")
+    run_session(cache, FakeLLM(4.0), subject="Math")
+    assess_turns, detector = run_session(cache, FakeLLM(4.0), subject="Physics")
+    assert assess_turns == 3
+    assert detector.prior["confidence"] == OTHER_SUBJECT_STRENGTH
+
+
+def test_rules_only_sessions_stay_out_of_the_prior():
+    cache = ProfileCache(strong_prior=0.85)
+    _, detector = run_session(cache, FakeLLM(fail=True))
+    assert detector.rules_only_turns == 3
+    run_session(cache, FakeLLM(fail=True))
+    profile = cache.get("s1")
+    assert profile.levels_by_subject == {}
+    assert profile.sessions == 2
+    assess_turns, detector = run_session(cache, FakeLLM(4.0))
+    assert assess_turns == 3 and detector.prior is None
+
+
+def test_disabled_cache_changes_nothing():
+    cache = ProfileCache(enabled=False)
+    run_session(cache, FakeLLM(4.0))
+    run_session(cache, FakeLLM(4.0))
+    assess_turns, detector = run_session(cache, FakeLLM(4.0))
+    assert assess_turns == cache.assess_turns and detector.prior is None
+    assert cache.format_report() == "disabled (ablation)"
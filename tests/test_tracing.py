@@ -0,0 +1,41 @@
+import json
+
+from src.tracing import critical_path, summarize
+
+
+def span(name, ts, dur, tid=1):
+    return {"name": name, "ph": "X", "ts": ts, "dur": dur, "tid": tid, "pid": 1}
+
+
+def test_turn_time_is_split_among_direct_children():
+    events = [
+        span("turn", 0, 1000),
+        span("llm.chat", 0, 400),
+        span("llm.inner", 100, 100),   # Nested in llm.chat: not double counted
+        span("judge.verify", 500, 300),
+        span("turn", 2000, 100),
+    ]
+    contributions = critical_path(events)
+    assert contributions["llm.chat"] == [0.4]
+    assert contributions["judge.verify"] == [0.3]
+    assert "llm.inner" not in contributions
+    assert contributions["turn.self"] == [0.3, 0.1]
+
+
+def test_other_threads_are_not_children():
+    events = [span("turn", 0, 1000, tid=1), span("prefetch", 0, 900, tid=2)]
+    contributions = critical_path(events)
+    assert "prefetch" not in contributions
+    assert contributions["turn.self"] == [1.0]
+
+
+def test_summarize_ranks_contributors(tmp_path):
+    events = [span("turn", 0, 1_000_000), span("llm.chat", 0, 900_000)]
+    for start in range(1, 20):
+        events += [span("turn", start * 2_000_000, 10_000), span("llm.chat", start * 2_000_000, 5_000)]
+    path = tmp_path / "trace.json"
+    path.write_text(json.dumps({"traceEvents": events}))
+    lines = summarize(str(path)).splitlines()
+    assert lines[0].startswith("20 turn spans")
+    assert lines[2].split()[0] == "llm.chat"
+    assert float(lines[2].split()[-1]) < 900  # p95 is interpolated, not the one slow turn
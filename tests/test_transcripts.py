@@ -0,0 +1,91 @@
+import sqlite3
+
+from src.transcripts import STUDENT, TUTOR, Message, TranscriptStore, as_dicts, iter_transcripts
+
+
+def fill(store, run_id="r1"):
+    store.start_run(run_id, "mini_dev")
+    for student, topic, level in (("s1", "t1", 2), ("s1", "t2", 4), ("s2", "t1", 2)):
+        session = store.start_session(run_id, "mini_dev", student, f"{student} Name", topic, f"Topic {topic}", "Math")
+        store.append_exchange(session, 1, "opening", f"{student} answer 1", 2.5, 0.4)
+        store.append_exchange(session, 2, "follow-up", f"{student} answer 2", float(level), 0.8)
+        store.finish_session(session, level)
+    store.finish_run(run_id, 0.25, 4.0)
+
+
+def count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_writes_are_batched_until_flush(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    store = TranscriptStore(path, flush_every=1000, flush_seconds=60)
+    fill(store)
+    assert count(path, "messages") == 0  # Still queued in the writer
+    store.flush()
+    assert count(path, "messages") == 12
+    store.close()
+
+
+def test_batch_size_triggers_a_commit(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    store = TranscriptStore(path, flush_every=2, flush_seconds=60)
+    store.start_run("r1", "mini_dev")
+    store.start_run("r2", "mini_dev")
+    store.flush()
+    assert count(path, "runs") == 2
+    store.close()
+
+
+def test_failed_batch_is_dropped_and_flush_returns(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    store = TranscriptStore(path)
+    store._put("INSERT INTO missing_table VALUES (?)", (1,))
+    store.flush()
+    assert store.dropped == 1
+    store.start_run("r1", "mini_dev")  # Writer still alive
+    store.flush()
+    assert count(path, "runs") == 1
+    store.close()
+
+
+def test_iter_sessions_filters_and_rebuilds_history(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    store = TranscriptStore(path)
+    fill(store)
+    store.close()
+
+    records = list(store.iter_sessions(student_id="s1"))
+    sessions = [r for r in records if r["type"] == "session"]
+    assert [(r["topic_id"], r["predicted_level"]) for r in sessions] == [("t1", 2), ("t2", 4)]
+    assert [m["role"] for m in sessions[0]["history"]] == [TUTOR, STUDENT, TUTOR, STUDENT]
+    assert [e["level"] for e in sessions[1]["estimates"]] == [2.5, 4.0]
+    assert [r["mse"] for r in records if r["type"] == "run"] == [0.25]
+
+    assert [r["student_id"] for r in store.iter_sessions(topic_id="t1", predicted_level=2)
+            if r["type"] == "session"] == ["s1", "s2"]
+    assert list(store.iter_sessions(run_id="other")) == []
+
+
+def test_iter_messages_streams_in_turn_order(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    store = TranscriptStore(path)
+    fill(store)
+    store.close()
+
+    rows = list(store.iter_messages(student_id="s2", batch_size=1))
+    assert [(turn, role) for _, turn, role, *_ in rows] == [(1, TUTOR), (1, STUDENT), (2, TUTOR), (2, STUDENT)]
+    assert rows[1][4:] == (2.5, 0.4)
+    assert len(list(iter_transcripts([path]))) == 4  # 3 sessions + 1 run
+
+
+def test_message_reads_like_a_dict():
+    msg = Message("student", "hi")
+    assert msg.role is STUDENT
+    assert msg["content"] == "hi" and msg.get("level") is None
+    assert as_dicts([msg, {"role": "tutor", "content": "x"}]) == [
+        {"role": "student", "content": "hi"}, {"role": "tutor", "content": "x"}]
@@ -0,0 +1,67 @@
+import json
+
+from src.warmup import ContentBank, _parse, warm_up
+
+ENTRY = {
+    "openings": ["What comes to mind?"],
+    "diagnostics": {"1": ["Easy?"], "3": ["Medium?", "Medium 2?"], "5": ["Hard?"]},
+}
+
+
+def test_parse_extracts_and_cleans_json():
+    response = 'Sure!\n{"openings": [" Hi? ", "", 3], "diagnostics": {"2": ["Why?", "  "]}}\nDone.'
+    assert _parse(response) == {"openings": ["Hi?"], "diagnostics": {"2": ["Why?"]}}
+
+
+def test_parse_rejects_empty_or_broken_content():
+    assert _parse("no json here") is None
+    assert _parse('{"openings": [') is None
+    assert _parse('{"openings": [], "diagnostics": {"1": []}}') is None
+    assert _parse(None) is None
+
+
+def test_diagnostic_falls_back_to_neighbouring_levels():
+    bank = ContentBank()
+    bank.put("Math", "Fractions", ENTRY)
+    assert bank.diagnostic("Math", "Fractions", 3, exclude=[]) == "Medium?"
+    assert bank.diagnostic("Math", "Fractions", 3, exclude=["Medium?"]) == "Medium 2?"
+    assert bank.diagnostic("Math", "Fractions", 2, exclude=[]) == "Easy?"         # Level below first
+    assert bank.diagnostic("Math", "Fractions", 4, exclude=["Medium?", "Medium 2?"]) == "Hard?"
+    assert bank.diagnostic("Math", "Fractions", 1, exclude=["Easy?"]) is None   # Level 0/2 empty
+    assert bank.diagnostic("Math", "Unknown", 3, exclude=[]) is None
+
+
+def test_same_topic_name_in_two_subjects_is_kept_apart(tmp_path):
+    path = str(tmp_path / "bank.json")
+    bank = ContentBank(path)
+    bank.put("Math", "Functions", ENTRY)
+    assert bank.has("Math", "Functions") and not bank.has("Computer Science", "Functions")
+    assert bank.opening("Computer Science", "Functions") is None
+    bank.save()
+    assert ContentBank(path).opening("Math", "Functions") == "What comes to mind?"
+
+
+def test_topic_only_entries_from_older_banks_are_dropped(tmp_path):
+    path = tmp_path / "bank.json"
+    path.write_text(json.dumps({"Functions": ENTRY, "Math::Functions": ENTRY}))
+    assert list(ContentBank(str(path)).topics) == ["Math::Functions"]
+
+
+class FakeLLM:
+    def __init__(self):
+        self.topics = []
+
+    def chat(self, system_prompt, user_message, temperature=0.7, site="default"):
+        self.topics.append(user_message)
+        return json.dumps(ENTRY)
+
+
+def test_warm_up_generates_missing_entries_only():
+    bank = ContentBank()
+    bank.put("Math", "Fractions", ENTRY)
+    llm = FakeLLM()
+    topics = [{"name": "Fractions", "subject_name": "Math"}, {"name": "Functions", "subject_name": "Math"},
+              {"name": "Functions", "subject_name": "Computer Science"}, {"name": "Functions", "subject_name": "Math"}]
+    assert warm_up(llm, bank, topics, log=lambda message: None) == 2
+    assert sorted(llm.topics) == ["Topic: Functions", "Topic: Functions"]
+    assert bank.has("Computer Science", "Functions") and bank.has("Math", "Functions")